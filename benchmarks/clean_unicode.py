@@ -0,0 +1,56 @@
+# Benchmark: `clean_unicode` fast path vs per-grapheme callbacks (the previous implementation)
+# Usage: python -m benchmarks.clean_unicode
+import timeit
+import unicodedata
+import regex
+from textutils.cleanup import clean_unicode
+
+GRAPHEME = regex.compile(r"\X")
+
+def is_symbol_like_reference(cluster: str) -> bool:
+    return len(cluster) > 1 or unicodedata.category(cluster) in {"So", "Sm", "Sc", "Sk"}
+
+def get_leading_cluster_reference(line: str) -> str | None:
+    stripped = line.lstrip()
+    m = GRAPHEME.match(stripped) if stripped else None
+    return m.group(0) if m and is_symbol_like_reference(m.group(0)) else None
+
+def clean_unicode_reference(text: str) -> str:
+    in_lines = text.splitlines()
+    clusters = [get_leading_cluster_reference(line) for line in in_lines]
+    out_lines = []
+    for i, line in enumerate(in_lines):
+        cluster = clusters[i]
+        if not cluster:
+            out_lines.append(line)
+            continue
+        content = line.strip()[len(cluster):]
+        if (i > 0 and clusters[i - 1] == cluster) or (i < len(in_lines) - 1 and clusters[i + 1] == cluster):
+            out_lines.append(f"- {content.rstrip()}" if content.rstrip() else "")
+        else:
+            out_lines.append(content.strip())
+    text = "\n".join(out_lines)
+    return GRAPHEME.sub(lambda m: " " if is_symbol_like_reference(m.group(0)) else m.group(0), text)
+
+EMOJI_FREE = (
+    "Требуется менеджер по продажам в Москве. Опыт работы от 1 года, знание CRM.\n"
+    "Зарплата 80-120 тыс. руб. + премии. Remote possible, English B2.\n"
+) * 20
+EMOJI_HEAVY = (
+    "🔥 Вакансия: Python-разработчик 👩‍💻\n"
+    "✅ Удалёнка 🇷🇺 / 🇪🇸\n"
+    "✅ Зарплата 200к ⚡️⚡️\n"
+    "📩 Пишите: @hr_bot 👋\n"
+) * 20
+
+if __name__ == "__main__":
+    for name, text in [("emoji-free", EMOJI_FREE), ("emoji-heavy", EMOJI_HEAVY)]:
+        assert clean_unicode(text) == clean_unicode_reference(text)
+        n = 200
+        old = timeit.timeit(lambda: clean_unicode_reference(text), number=n) / n
+        new = timeit.timeit(lambda: clean_unicode(text), number=n) / n
+        mb = len(text.encode("utf-8")) / 1e6
+        print(
+            f"{name:<12} {len(text):>6} chars | per-grapheme {old * 1e6:8.1f} µs ({mb / old:6.1f} MB/s)"
+            f" | fast path {new * 1e6:8.1f} µs ({mb / new:6.1f} MB/s) | x{old / new:.1f}"
+        )
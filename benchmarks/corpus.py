@@ -0,0 +1,78 @@
+# Seeded generator of synthetic Telegram job posts
+import random
+
+TITLES = [
+    "Требуется менеджер по продажам", "Ищем Python-разработчика", "Вакансия: SMM-специалист",
+    "Нужен монтажер видео", "Курьер в службу доставки", "Remote: Frontend developer (React)",
+    "Оператор call-центра", "Помощник руководителя", "Дизайнер карточек для маркетплейсов",
+]
+SENTENCES = [
+    "Опыт работы от 1 года, знание CRM будет плюсом.",
+    "График 5/2, офис в центре Москвы или удаленка.",
+    "Обучение за счет компании, дружный коллектив.",
+    "Официальное оформление по ТК РФ, белая зарплата.",
+    "We offer flexible hours and a modern stack: Python, FastAPI, PostgreSQL.",
+    "Без опыта, всему научим!",
+    "Звонить после 18:00, в выходные не беспокоить.",
+    "Возраст: 18+, гражданство РФ.",
+]
+EMOJI_BULLETS = ["🔸", "✅", "✦", "⚡️", "👉", "📌", "🔥", "💰"]
+EMOJI_NOISE = ["👩‍💻", "👨🏻‍🚒", "👨‍👩‍👧‍👦", "🇷🇺", "🇪🇸", "🇰🇿", "🤍🩶🩶", "3️⃣", "🚀", "😊"]
+PHONES = [
+    "+7-920-123-45-67", "+7 (920) 123-45-67", "+1 123 456 7890", "+44 20 7946 0958",  # Option 1
+    "(495)123-45-67", "8 (920) 123-45-67", "7(812)555-12-34",                          # Option 2
+    "8 999 123 45 67", "89991234567", "8-999-123-45-67",                               # Option 3
+]
+CONTACTS = [
+    "https://t.me/joinchat/AbCdEf123", "http://example.com/vacancy?id=42", "www.hh.ru/vacancy/123456",
+    "career.company.io/jobs", "hr@company.ru", "john.smith@example.com", "@hr_manager", "@jobs_bot",
+    "ИНН: 7707083893",
+]
+PRICES = [
+    "{a} тыс", "{a} тыс.", "{a}тыс", "{a} тысячи", "{a}тр", "{a} тр.", "{a} руб", "{a} рублей", "{a}р",
+    "{a}₽", "{a} $", "{a}€", "{a}-{b} тыс руб", "{a} – {b} тыс. ₽", "от {a} до {b} тыс", "от {a}000 до {b}000 руб",
+    "{a}.000 рублей", "{a} 000 ₽", "{a},5 тыс", "{a}`000 руб", "{a}к/мес", "{a}%", "#{a}{b}",
+]
+
+def price(rng: random.Random) -> str:
+    a = rng.randint(1, 300)
+    b = a + rng.randint(5, 100)
+    return rng.choice(PRICES).format(a=a, b=b)
+
+def line(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.35:
+        return rng.choice(SENTENCES)
+    if kind < 0.6:
+        return f"Зарплата {price(rng)}, бонусы до {price(rng)}"
+    if kind < 0.8:
+        return f"Контакты: {rng.choice(PHONES)}, {rng.choice(CONTACTS)}"
+    return f"{rng.choice(EMOJI_NOISE)} {rng.choice(SENTENCES)} {rng.choice(EMOJI_NOISE)}"
+
+def post(rng: random.Random) -> str:
+    bullet = rng.choice(EMOJI_BULLETS)
+    lines = [f"{rng.choice(EMOJI_NOISE)} **{rng.choice(TITLES)}** {rng.choice(EMOJI_NOISE)}", ""]
+    for _ in range(rng.randint(2, 6)):
+        lines.append(f"{bullet} {line(rng)}")
+    lines.append("")
+    lines += [line(rng) for _ in range(rng.randint(1, 4))]
+    lines.append(rng.choice(["", "\n\n\n", "-------", "*** *** ***"]))
+    lines.append(f"📩 {rng.choice(CONTACTS)} {rng.choice(PHONES)}")
+    return "\n".join(lines)
+
+def generate(size: int, seed: int = 0) -> str:
+    """
+    A text of about `size` UTF-8 bytes: one post or, for large sizes, a channel export of posts
+    """
+    rng = random.Random(f"{seed}:{size}")
+    parts: list[str] = []
+    total = 0
+    while total < size:
+        part = post(rng)
+        parts.append(part)
+        total += len(part.encode("utf-8")) + 2
+    text = "\n\n".join(parts)
+    return text.encode("utf-8")[:size].decode("utf-8", "ignore")
+
+def corpus(size: int, count: int, seed: int = 0) -> list[str]:
+    return [generate(size, seed=seed * 1_000_003 + i) for i in range(count)]
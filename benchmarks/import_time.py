@@ -0,0 +1,62 @@
+# Cold-start benchmark: import time of textutils entry points, each in a fresh interpreter
+# Usage:
+#   python -m benchmarks.import_time
+#   python -m benchmarks.import_time --scale 2  # slower machine: double the budgets
+import argparse
+import json
+import subprocess
+import sys
+
+# Statement -> budget in ms (best of --repeat runs, interpreter startup excluded)
+BUDGETS: dict[str, float] = {
+    "import textutils": 15,
+    "from textutils import mask_contacts": 60,
+    "from textutils import preprocess": 100,
+}
+# Must not be loaded by a bare `import textutils`
+HEAVY_MODULES = ["regex", "asyncio", "concurrent.futures", "multiprocessing", "sqlite3", "numpy", "textutils.mask"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(sys.modules)}}))
+"""
+
+def measure(statement: str, repeat: int) -> tuple[float, list[str]]:
+    best, modules = float("inf"), []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement)], capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout)
+        best, modules = min(best, result["ms"]), result["modules"]
+    return best, modules
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.import_time", description="textutils import-time budgets")
+    parser.add_argument("--repeat", type=int, default=7, help="best of N runs (default: 7)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply budgets, for slower machines (default: 1)")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for statement, budget in BUDGETS.items():
+        ms, modules = measure(statement, args.repeat)
+        budget *= args.scale
+        print(f"{statement:<40} {ms:7.1f} ms (budget {budget:.0f} ms)", flush=True)
+        if ms > budget:
+            failures.append(f"{statement}: {ms:.1f} ms > {budget:.0f} ms")
+        if statement == "import textutils":
+            loaded = [name for name in HEAVY_MODULES if name in modules]
+            if loaded:
+                failures.append(f"{statement} loads {', '.join(loaded)}")
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    if failures:
+        return 1
+    print("Import times within budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
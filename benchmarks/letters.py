@@ -0,0 +1,33 @@
+# Benchmark: `strip_diacritics`/`fold_letters` translate tables vs the usual NFD/NFKD-and-filter loop
+# Usage: python -m benchmarks.letters
+import timeit
+import unicodedata
+from textutils.letters import fold_letters, fold_letters_many, strip_diacritics, strip_diacritics_many
+from .corpus import corpus
+
+def strip_reference(text: str, form: str = "NFD") -> str:
+    decomposed = unicodedata.normalize(form, text)
+    return unicodedata.normalize("NFC", "".join(c for c in decomposed if not unicodedata.combining(c)))
+
+MIXED = (
+    "Ищем менеджера в Москве, опыт от 1 года. Её команда: Алёна, Сергей и Андрей.\n"
+    "Café partner in Zürich, résumé in English. Зарплата 80-120 тыс. руб., ﬁxed ＋ бонус…\n"
+) * 20
+
+if __name__ == "__main__":
+    posts = [post + " Café Zürich, ёлка" for post in corpus(2_000, 200)]
+    for name, texts in [("mixed", [MIXED] * 10), ("posts", posts)]:
+        mb = sum(len(text.encode("utf-8")) for text in texts) / 1e6
+        for label, func, batch, form in [
+            ("strip_diacritics", strip_diacritics, strip_diacritics_many, "NFD"),
+            ("fold_letters", fold_letters, fold_letters_many, "NFKD"),
+        ]:
+            assert [func(text) for text in texts] == batch(texts) == [strip_reference(text, form) for text in texts]
+            n = 5
+            old = timeit.timeit(lambda: [strip_reference(text, form) for text in texts], number=n) / n
+            new = timeit.timeit(lambda: [func(text) for text in texts], number=n) / n
+            many = timeit.timeit(lambda: batch(texts), number=n) / n
+            print(
+                f"{name:<6} {label:<17} | {form} loop {old * 1e3:7.1f} ms ({mb / old:6.1f} MB/s)"
+                f" | table {new * 1e3:7.1f} ms ({mb / new:6.1f} MB/s) | batch {many * 1e3:7.1f} ms | x{old / new:.1f}"
+            )
@@ -0,0 +1,93 @@
+# Benchmark suite: end-to-end and per-stage throughput on a synthetic corpus
+# Usage:
+#   python -m benchmarks.run --save baseline.json
+#   python -m benchmarks.run --compare baseline.json --threshold 0.2
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable
+from textutils import bucket_numbers, clean_unicode, preprocess
+from textutils.pipeline import PREPROCESS
+from .corpus import corpus
+
+# Texts per corpus size: keeps every size at a comparable amount of work
+SIZES = {200: 500, 2_000: 100, 20_000: 10, 1_000_000: 1}
+
+def stage_inputs(texts: list[str]) -> dict[str, tuple[Callable[[str], str], list[str]]]:
+    """
+    Every stage gets the texts it would get inside `preprocess`
+    """
+    inputs: dict[str, tuple[Callable[[str], str], list[str]]] = {
+        "preprocess": (preprocess, texts),
+        "clean_unicode": (clean_unicode, texts),
+    }
+    current = texts
+    for stage in PREPROCESS.stages:
+        inputs[stage.name] = (stage.func, current)
+        current = [stage.func(text) for text in current]
+    inputs["bucket_numbers"] = (bucket_numbers, current)
+    return inputs
+
+def measure(func: Callable[[str], str], texts: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def run(sizes: list[int], repeat: int, seed: int) -> dict[str, float]:
+    """
+    Returns MB/s per "stage@size"
+    """
+    results: dict[str, float] = {}
+    for size in sizes:
+        texts = corpus(size, SIZES.get(size, 10), seed=seed)
+        for name, (func, inputs) in stage_inputs(texts).items():
+            mb = sum(len(text.encode("utf-8")) for text in inputs) / 1e6
+            elapsed = measure(func, inputs, repeat)
+            results[f"{name}@{size}"] = mb / elapsed
+            print(f"{name:<22} {size:>9} B | {mb / elapsed:9.2f} MB/s", flush=True)
+    return results
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    regressions = []
+    for key, before in baseline.items():
+        after = results.get(key)
+        if after is None:
+            continue
+        change = (after - before) / before
+        if change < -threshold:
+            regressions.append(f"{key}: {before:.2f} -> {after:.2f} MB/s ({change:+.0%})")
+    return regressions
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="textutils throughput benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated post sizes in bytes")
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs (default: 5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write results as baseline JSON")
+    parser.add_argument("--compare", help="baseline JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown, 0.15 = 15%% (default)")
+    args = parser.parse_args(argv)
+
+    results = run([int(size) for size in args.sizes.split(",")], args.repeat, args.seed)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(), "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# Thread scaling of preprocess_threaded: near-linear on free-threaded CPython (3.13t+),
+# with the GIL only the `regex` parts matched with `concurrent=True` overlap. The "GIL-free" column is
+# their share of the single-thread time and "bound" the best speedup it allows with the GIL (Amdahl)
+# Usage:
+#   python -m benchmarks.threads
+#   python -m benchmarks.threads --threads 1,2,4,8 --size 2000
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import sysconfig
+import time
+from typing import Callable
+from textutils import clean_unicode, denoise, preprocess, preprocess_threaded
+from .corpus import corpus
+
+def gil_status() -> str:
+    if not sysconfig.get_config_var("Py_GIL_DISABLED"):
+        return "GIL build"
+    # An extension without free-threading support (e.g. an old `regex`) turns the GIL back on at import
+    return "free-threaded, GIL disabled" if not sys._is_gil_enabled() else "free-threaded build, GIL re-enabled"
+
+def gil_free_share(func: Callable[[str], str], texts: list[str]) -> float:
+    """
+    Share of the time spent in the `regex` scans that release the GIL (`search`/`sub` with `concurrent=True`)
+    """
+    profile = cProfile.Profile()
+    profile.runcall(lambda: [func(text) for text in texts])
+    stats = pstats.Stats(profile).stats
+    total = sum(own for _, _, own, _, _ in stats.values())
+    released = sum(
+        own for (_, _, name), (_, _, own, _, _) in stats.items()
+        if name in ("<method 'search' of '_regex.Pattern' objects>", "<method 'sub' of '_regex.Pattern' objects>")
+    )
+    return released / total
+
+def measure(func: Callable[[str], str], texts: list[str], threads: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in preprocess_threaded(texts, func, workers=threads):
+            pass
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.threads", description="preprocess_threaded scaling")
+    parser.add_argument("--threads", default=",".join(str(n) for n in [1, 2, 4, os.cpu_count() or 1] if n <= (os.cpu_count() or 1)))
+    parser.add_argument("--size", type=int, default=2_000, help="post size in bytes (default: 2000)")
+    parser.add_argument("--count", type=int, default=400, help="posts (default: 400)")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs (default: 3)")
+    args = parser.parse_args(argv)
+
+    texts = corpus(args.size, args.count)
+    mb = sum(len(text.encode("utf-8")) for text in texts) / 1e6
+    print(f"Python {sys.version.split()[0]}, {gil_status()}, {os.cpu_count()} cores")
+    for func in [preprocess, denoise, clean_unicode]:
+        share = gil_free_share(func, texts)
+        print(f"{func.__name__:<15} GIL-free {share:.0%}, bound with the GIL x{1 / (1 - share):.2f}", flush=True)
+        single = None
+        for threads in sorted({int(n) for n in args.threads.split(",")}):
+            elapsed = measure(func, texts, threads, args.repeat)
+            single = single or elapsed
+            print(f"{func.__name__:<15} {threads:>3} threads | {mb / elapsed:7.2f} MB/s | x{single / elapsed:.2f}", flush=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
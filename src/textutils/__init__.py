@@ -1,30 +1,117 @@
-import re
-from .bucket import bucket_numbers
-from .cleanup import denoise, normalize_whitespace, clean_unicode
-from .fold import fold_currencies, fold_numbers, fold_scale_units, fold_shortcuts
-from .mask import mask_contacts
-
-def preprocess(text: str) -> str:
-    text = denoise(text)
-    ################################################################################################
-    # UNGROUPED STUFF YET
-    # Unify secondary whitespace cases
-    text = re.sub(r"(?<=\d)р\b", " р", text)
-    text = re.sub(r"(?<=\d)(₽|\$|€)", r" \1", text)
-    text = re.sub(r"(?<=\d)м2\b", " м2", text)
-    # Collapse common "от NUM до NUM" cases
-    text = re.sub(r"\bот\s+(\d+)\d\s+до\s+(\d+)", r"\1–\2", text, flags=re.IGNORECASE)
-    ################################################################################################
-    text = mask_contacts(text)
-    text = fold_shortcuts(text)
-    text = fold_numbers(text)
-    text = fold_scale_units(text)
-    text = fold_currencies(text)
-    text = normalize_whitespace(text)
-    return text
+import importlib
+
+TYPE_CHECKING = False # `typing.TYPE_CHECKING` without importing `typing`
+
+# Public name -> submodule. Submodules are imported on first access (PEP 562),
+# so `import textutils` doesn't pay for `regex`, process pools, asyncio or sqlite it may not use.
+EXPORTS: dict[str, str] = {
+    "BucketScheme": "bucket",
+    "bucket_numbers": "bucket",
+    "bucket_values": "bucket",
+    "register_scheme": "bucket",
+    "denoise": "cleanup",
+    "normalize_whitespace": "cleanup",
+    "clean_unicode": "cleanup",
+    "denoise_lines": "cleanup",
+    "normalize_whitespace_lines": "cleanup",
+    "Salary": "fold",
+    "extract_salaries": "fold",
+    "fold_amounts": "fold",
+    "fold_currencies": "fold",
+    "fold_numbers": "fold",
+    "fold_scale_units": "fold",
+    "fold_shortcuts": "fold",
+    "fold_letters": "letters",
+    "fold_letters_many": "letters",
+    "strip_diacritics": "letters",
+    "strip_diacritics_many": "letters",
+    "Contact": "mask",
+    "extract_contacts": "mask",
+    "mask_contacts": "mask",
+    "PREPROCESS": "pipeline",
+    "BudgetExceeded": "pipeline",
+    "Pipeline": "pipeline",
+    "Stage": "pipeline",
+    "VIEWS": "pipeline",
+    "Views": "pipeline",
+    "preprocess": "pipeline",
+    "preprocess_salaries": "pipeline",
+    "use_packs": "rules",
+    "preprocess_many": "batch",
+    "preprocess_threaded": "batch",
+    "preprocess_stream": "aio",
+    "Cache": "cache",
+    "LineCache": "cache",
+    "RecordIndex": "corpus",
+    "Shard": "corpus",
+    "plan_shards": "corpus",
+    "run_corpus": "corpus",
+    "DuplicateIndex": "dedupe",
+    "MinHasher": "dedupe",
+    "Trace": "trace",
+    "estimate_tokens": "tokens",
+    "truncate_many": "tokens",
+    "truncate_to_budget": "tokens",
+    "truncation_stage": "tokens",
+}
+# Submodules that need an optional extra (`pip install leadscanr-utils[numpy]`), `warmup` skips them when it's missing
+OPTIONAL = {"dedupe"}
+SUBMODULES = ["aio", "batch", "bucket", "cache", "cleanup", "cli", "corpus", "dedupe", "fold", "lazy", "letters", "mask", "pipeline", "rules", "tokens", "trace"]
+
+__all__ = [*EXPORTS, "warmup"]
+
+if TYPE_CHECKING:
+    from .bucket import BucketScheme, bucket_numbers, bucket_values, register_scheme
+    from .cleanup import denoise, normalize_whitespace, clean_unicode, denoise_lines, normalize_whitespace_lines
+    from .fold import Salary, extract_salaries, fold_amounts, fold_currencies, fold_numbers, fold_scale_units, fold_shortcuts
+    from .letters import fold_letters, fold_letters_many, strip_diacritics, strip_diacritics_many
+    from .mask import Contact, extract_contacts, mask_contacts
+    from .pipeline import PREPROCESS, VIEWS, BudgetExceeded, Pipeline, Stage, Views, preprocess, preprocess_salaries
+    from .rules import use_packs
+    from .batch import preprocess_many, preprocess_threaded
+    from .aio import preprocess_stream
+    from .cache import Cache, LineCache
+    from .corpus import RecordIndex, Shard, plan_shards, run_corpus
+    from .dedupe import DuplicateIndex, MinHasher
+    from .trace import Trace
+    from .tokens import estimate_tokens, truncate_many, truncate_to_budget, truncation_stage
+
+def __getattr__(name: str) -> object:
+    if name in SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name not in EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *EXPORTS, *SUBMODULES})
+
+def warmup() -> None:
+    """
+    Import every submodule and compile every pattern now rather than on first use,
+    e.g. in a long-lived server before it starts taking requests or forks workers
+    """
+    from .lazy import LazyPattern
+    from .letters import letter_table
+    for name in SUBMODULES:
+        try:
+            module = importlib.import_module(f".{name}", __name__)
+        except ImportError:
+            if name in OPTIONAL:
+                continue
+            raise
+        for value in vars(module).values():
+            if isinstance(value, LazyPattern):
+                value.compile()
+    for form in ["NFD", "NFKD"]:
+        letter_table(form)
+    from .pipeline import preprocess
+    preprocess("🔸 Зарплата 100 тыс руб, +7 (920) 123-45-67, hr@example.com\n🔸 ИНН: 1234567890")
 
 # Information-destructive steps are applied separately:
-# - diacritics removal
-# - number bucketing
+# - diacritics removal (`strip_diacritics`, `fold_letters`)
+# - number bucketing (`bucket_numbers`)
 # - etc
 # Note: contact masking is also destrucrive, should be moved outside!
@@ -0,0 +1,77 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Callable
+from .pipeline import preprocess
+from .rules import RULES, install
+
+END = object() # queued by the feeder once the input is exhausted
+
+async def preprocess_stream(
+    texts: AsyncIterable[str],
+    func: Callable[[str], str] = preprocess,
+    *,
+    max_in_flight: int | None = None,
+    executor: Executor | None = None,
+    ordered: bool = True,
+    return_exceptions: bool = False,
+) -> AsyncIterator[str | Exception]:
+    """
+    Async counterpart of `preprocess_many`: apply `func` to an async stream of texts
+    in `executor` (a process pool by default), without blocking the event loop:
+    - at most `max_in_flight` texts (default: 2 per core) are submitted but not yet yielded,
+      the input isn't pulled further until the consumer catches up
+    - results are yielded in input order, or as they complete with `ordered=False`
+    - with `return_exceptions=True` a failing item yields its exception instead of aborting
+    - an error in the input is raised after the results of the texts read before it
+    - on exit (exhausted, `break`, error or cancellation) pending work is cancelled,
+      a pool created here is shut down without waiting, a passed `executor` is left running
+    - a pool created here hands the installed rule pack to its workers, a passed process pool
+      needs `initializer=rules.install, initargs=(RULES.compiled,)` for that
+    """
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if executor is None:
+        executor = ProcessPoolExecutor(initializer=install, initargs=(RULES.compiled,))
+    slots = asyncio.Semaphore(max_in_flight or 2 * (os.cpu_count() or 1))
+    queue: asyncio.Queue = asyncio.Queue() # futures (in input or completion order), then END or an input error
+    in_flight: set[asyncio.Future] = set()
+
+    async def feed() -> None:
+        error = None
+        try:
+            async for text in texts:
+                await slots.acquire()
+                future = loop.run_in_executor(executor, func, text)
+                in_flight.add(future)
+                future.add_done_callback(in_flight.discard)
+                if ordered:
+                    queue.put_nowait(future)
+                else:
+                    future.add_done_callback(queue.put_nowait)
+        except Exception as e:
+            error = e
+        if not ordered and in_flight:
+            await asyncio.wait(in_flight) # their callbacks queue them before END
+        queue.put_nowait(END if error is None else error)
+
+    feeder = loop.create_task(feed())
+    try:
+        while (item := await queue.get()) is not END:
+            if isinstance(item, Exception):
+                raise item
+            try:
+                result = await item
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                result = e
+            finally:
+                slots.release()
+            yield result
+    finally:
+        feeder.cancel()
+        for future in list(in_flight):
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,89 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+from .pipeline import preprocess
+from .rules import RULES, install
+
+def batched(items: Iterable[str], size: int) -> Iterator[list[str]]:
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+def run_chunk(func: Callable[[str], str], texts: list[str], return_exceptions: bool) -> list:
+    if not return_exceptions:
+        return [func(text) for text in texts]
+    results: list = []
+    for text in texts:
+        try:
+            results.append(func(text))
+        except Exception as e:
+            results.append(e)
+    return results
+
+def run_pooled(
+    pool: Executor, func: Callable[[str], str], texts: Iterable[str], workers: int, chunksize: int, return_exceptions: bool,
+) -> Iterator[str | Exception]:
+    # At most `2 * workers` chunks in flight, results in input order
+    pending: deque[Future] = deque()
+    try:
+        for chunk in batched(texts, chunksize):
+            pending.append(pool.submit(run_chunk, func, chunk, return_exceptions))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def preprocess_many(
+    texts: Iterable[str],
+    func: Callable[[str], str] = preprocess,
+    *,
+    workers: int | None = None,
+    chunksize: int = 256,
+    return_exceptions: bool = False,
+) -> Iterator[str | Exception]:
+    """
+    Apply `func` (`preprocess`, `mask_contacts`, `bucket_numbers`, any picklable `str -> str`)
+    to `texts` in a process pool. Results are yielded lazily and in input order:
+    - texts are sent to workers in chunks of `chunksize` to cut pickling round-trips
+    - at most `2 * workers` chunks are in flight, so memory is bounded on huge inputs
+    - with `return_exceptions=True` a failing item yields its exception instead of aborting
+    - `workers=1` runs in the current process without a pool
+    - workers use the rule pack installed here (`use_packs`), whatever their start method
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in batched(texts, chunksize):
+            yield from run_chunk(func, chunk, return_exceptions)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=install, initargs=(RULES.compiled,))
+    yield from run_pooled(pool, func, texts, workers, chunksize, return_exceptions)
+
+def gil_enabled() -> bool:
+    """
+    Whether threads take turns: always before 3.13, on free-threaded builds unless an extension turned the GIL back on
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is None or is_gil_enabled()
+
+def preprocess_threaded(
+    texts: Iterable[str],
+    func: Callable[[str], str] = preprocess,
+    *,
+    workers: int | None = None,
+    chunksize: int = 16,
+    return_exceptions: bool = False,
+) -> Iterator[str | Exception]:
+    """
+    `preprocess_many` in a thread pool: no pickling, no worker processes, `func` needn't be picklable.
+    Parallel only on free-threaded CPython (3.13t+) with the GIL disabled, hence `workers` defaults to
+    the number of cores there and to 1 otherwise. With the GIL, threads overlap only while `regex`
+    matches with `concurrent=True` (the symbol scans of `clean_unicode`/`denoise`), a few percent of
+    `preprocess`: use `preprocess_many` for throughput. `python -m benchmarks.threads` measures the scaling.
+    """
+    workers = workers or (1 if gil_enabled() else os.cpu_count() or 1)
+    yield from run_pooled(ThreadPoolExecutor(max_workers=workers), func, texts, workers, chunksize, return_exceptions)
@@ -1,4 +1,10 @@
 import re
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Iterable
+from .trace import sub
+
+if TYPE_CHECKING:
+    import numpy as np
 
 BUCKETS = [
     (200, 500, "0.5k"),         # 300
@@ -22,7 +28,83 @@ BUCKETS = [
     (360_000, 440_000, "440k"), # 80k
 ]
 
-def bucket_numbers(text: str) -> str:
+NUMBER = re.compile(r"(?<!#)\b\d+\b(?!%)")
+
+class BucketScheme:
+    """
+    Compiled bucketing scheme: `(lower, upper, label)` buckets sorted by bounds,
+    both bounds inclusive, the first matching bucket wins (as in `BUCKETS`).
+    Numbers below the first bucket are left untouched, numbers matching no bucket get `overflow`.
+    """
+    def __init__(self, buckets: Iterable[tuple[int, int, str]], overflow: str):
+        buckets = list(buckets)
+        if not buckets:
+            raise ValueError("BucketScheme needs at least one bucket")
+        for (lower1, upper1, _), (lower2, upper2, _) in zip(buckets, buckets[1:]):
+            if not (lower1 <= lower2 and upper1 <= upper2):
+                raise ValueError(f"Buckets must be sorted by bounds, got {buckets!r}")
+        self.buckets = buckets
+        self.lowers = [lower for lower, _, _ in buckets]
+        self.uppers = [upper for _, upper, _ in buckets]
+        self.labels = [label for _, _, label in buckets]
+        self.overflow = overflow
+
+    def __repr__(self) -> str:
+        return f"BucketScheme({len(self.buckets)} buckets, {self.lowers[0]}..{self.uppers[-1]}, overflow={self.overflow!r})"
+
+    def label(self, n: int) -> str | None:
+        """
+        Bucket label for `n`, `None` if `n` is below the first bucket
+        """
+        if n < self.lowers[0]:
+            return None
+        i = bisect_left(self.uppers, n) # first bucket with upper >= n
+        if i < len(self.uppers) and self.lowers[i] <= n:
+            return self.labels[i]
+        return self.overflow
+
+    def bucket_values(self, values: "np.ndarray", under: str = "") -> "np.ndarray":
+        """
+        Vectorized bucketing of a numeric column (`searchsorted` semantics, same bounds as `label`).
+        Values below the first bucket and NaNs get `under`. Requires NumPy.
+        """
+        import numpy as np
+        values = np.asarray(values, dtype=float)
+        lowers = np.asarray(self.lowers, dtype=float)
+        uppers = np.asarray(self.uppers, dtype=float)
+        labels = np.array(self.labels + [self.overflow, under], dtype=object)
+        i = np.searchsorted(uppers, values, side="left")
+        in_bucket = (i < len(uppers)) & (lowers[np.minimum(i, len(uppers) - 1)] <= values)
+        i = np.where(in_bucket, i, len(uppers)) # overflow
+        i = np.where((values < lowers[0]) | np.isnan(values), len(uppers) + 1, i) # under
+        return labels[i]
+
+DEFAULT_SCHEME = BucketScheme(BUCKETS, overflow=">440 тыс")
+
+SCHEMES: dict[str, BucketScheme] = {
+    "default": DEFAULT_SCHEME,
+}
+# Bumped by `register_scheme`: caches take the fingerprint of the schemes again
+generation = 0
+
+def register_scheme(name: str, scheme: BucketScheme) -> None:
+    """
+    Register an alternate scheme to be used by name, e.g.
+    `register_scheme("usd", BucketScheme([(10, 100, "0.1k"), (100, 1_000, "1k")], overflow=">1k"))`
+    """
+    global generation
+    SCHEMES[name] = scheme
+    generation += 1
+
+def get_scheme(scheme: str | BucketScheme) -> BucketScheme:
+    if isinstance(scheme, BucketScheme):
+        return scheme
+    try:
+        return SCHEMES[scheme]
+    except KeyError:
+        raise ValueError(f"Unknown bucket scheme {scheme!r}, expected one of: {', '.join(SCHEMES)}") from None
+
+def bucket_numbers(text: str, scheme: str | BucketScheme = "default") -> str:
     """
     Replaces numbers in text with buckets according to rules:
     - Floats untouched
@@ -31,20 +113,22 @@ def bucket_numbers(text: str) -> str:
     - Numbers preceded by '#' are ignored
     - Numbers followed by '%' are ignored
     """
+    scheme = get_scheme(scheme)
+
     def replacer(match: re.Match) -> str:
         num_str = match.group(0)
         # Skip floats
         if '.' in num_str:
             return num_str
-        n = int(num_str)
-        # Skip small out-of-bucket numbers
-        if n < BUCKETS[0][0]:
-            return num_str
-        # Find bucket
-        for lower, upper, label in BUCKETS:
-            if lower <= n <= upper:
-                return label
-        return ">440 тыс"
+        # Skip small out-of-bucket numbers, find bucket
+        label = scheme.label(int(num_str))
+        return num_str if label is None else label
 
-    text = re.sub(r"(?<!#)\b\d+\b(?!%)", replacer, text)
+    text = sub("bucket.NUMBER", NUMBER, replacer, text)
     return text
+
+def bucket_values(values: "np.ndarray", scheme: str | BucketScheme = "default", under: str = "") -> "np.ndarray":
+    """
+    Bucket a whole column of parsed numbers at once, see `BucketScheme.bucket_values`
+    """
+    return get_scheme(scheme).bucket_values(values, under=under)
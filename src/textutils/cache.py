@@ -0,0 +1,345 @@
+import hashlib
+import os
+import re
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from types import ModuleType
+from typing import Callable
+import regex
+from . import bucket, cleanup, fold, letters, mask, pipeline
+from .cleanup import (
+    BULLET, NOISE, collapse_lines, get_leading_cluster, normalize_leading_emoji, replace_symbols, space_lines, unify_chars,
+)
+from .fold import NUMERIC_ISLAND
+from .lazy import LazyPattern
+from .pipeline import PREPROCESS, STAGES, Pipeline, Stage, Views
+from .rules import RULES
+
+# Modules whose rules (compiled patterns, bucket schemes) define what the stages output
+RULE_MODULES: list[ModuleType] = [bucket, cleanup, fold, letters, mask, pipeline]
+
+def module_rules(module: ModuleType) -> list[str]:
+    rules = []
+    for name, value in sorted(vars(module).items()):
+        if isinstance(value, (re.Pattern, regex.Pattern, LazyPattern)):
+            rules.append(f"{module.__name__}.{name}={value.pattern!r}/{value.flags}")
+        elif name.isupper() and isinstance(value, (list, tuple)):
+            rules.append(f"{module.__name__}.{name}={value!r}")
+        elif isinstance(value, bucket.BucketScheme):
+            rules.append(f"{module.__name__}.{name}={describe(value)}")
+        elif name.isupper() and isinstance(value, dict):
+            # registered bucket schemes, looked up by name at call time
+            rules.extend(
+                f"{module.__name__}.{name}[{key!r}]={describe(scheme)}"
+                for key, scheme in sorted(value.items()) if isinstance(scheme, bucket.BucketScheme)
+            )
+    return rules
+
+def describe(func: object) -> str:
+    """
+    What a stage computes, parameters included: chains and views by their stages, stages by their
+    functions, `partial`s by their arguments (`max_tokens`, a bucket scheme), functions by their qualified name
+    """
+    if isinstance(func, Views):
+        return "{" + ", ".join(f"{name!r}: {describe(chain)}" for name, chain in func.views.items()) + "}"
+    if isinstance(func, Pipeline):
+        return "[" + ", ".join(describe(stage) for stage in func.stages) + "]"
+    if isinstance(func, Stage):
+        return f"{func.name}={describe(func.func)}"
+    if isinstance(func, partial):
+        args = [describe(arg) for arg in func.args]
+        args += [f"{name}={describe(value)}" for name, value in sorted(func.keywords.items())]
+        return f"{describe(func.func)}({', '.join(args)})"
+    if isinstance(func, bucket.BucketScheme):
+        return f"{func.buckets!r}/{func.overflow!r}"
+    if callable(func):
+        kind = func if hasattr(func, "__qualname__") else type(func)
+        return f"{kind.__module__}.{kind.__qualname__}"
+    return repr(func)
+
+def fingerprint(chain: Pipeline | Callable[[str], str] = PREPROCESS) -> str:
+    """
+    Version fingerprint of the rules: changes whenever a bucket scheme, any compiled pattern
+    in the rule modules, the installed rule pack or the chain of stages (with its parameters) changes,
+    so cached results go stale automatically
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for line in [describe(chain), RULES.digest] + [rule for module in RULE_MODULES for rule in module_rules(module)]:
+        h.update(line.encode("utf-8") + b"\n")
+    return h.hexdigest()
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    disk_hits: int = 0 # subset of `hits` served by the persistent tier
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+class Cache:
+    """
+    Content-addressed result cache for a `str -> str` stage (`preprocess` by default):
+    - key: hash of the input text + rules fingerprint
+    - tier 1: in-memory LRU, bounded by `maxsize` entries
+    - tier 2 (optional): SQLite file at `path`, safe to share between worker processes
+    """
+    def __init__(
+        self,
+        func: Callable[[str], str] = PREPROCESS,
+        *,
+        maxsize: int = 100_000,
+        path: str | os.PathLike | None = None,
+    ):
+        self.func = func
+        self.maxsize = maxsize
+        self.path = path
+        self.fingerprint = fingerprint(func)
+        # the fingerprint is taken again when another rule pack is installed or a bucket scheme registered
+        self.rules = RULES.digest, bucket.generation
+        self.stats = CacheStats()
+        self.memory: OrderedDict[bytes, str] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._db_pid: int | None = None
+
+    def __getstate__(self) -> dict:
+        # Connections and memory tier stay in their process, workers start empty
+        state = self.__dict__.copy()
+        state.update(memory=OrderedDict(), stats=CacheStats(), _db=None, _db_pid=None)
+        return state
+
+    def key(self, text: str) -> bytes:
+        h = hashlib.blake2b(self.fingerprint.encode("ascii"), digest_size=16)
+        h.update(text.encode("utf-8", "surrogatepass"))
+        return h.digest()
+
+    @property
+    def db(self) -> sqlite3.Connection | None:
+        if self.path is None:
+            return None
+        if self._db is None or self._db_pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, fingerprint TEXT, value TEXT)"
+            )
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+
+    def remember(self, key: bytes, value: str) -> None:
+        self.memory[key] = value
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def __call__(self, text: str) -> str:
+        if self.rules != (RULES.digest, bucket.generation):
+            self.fingerprint, self.rules = fingerprint(self.func), (RULES.digest, bucket.generation)
+        key = self.key(text)
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory.move_to_end(key)
+            self.stats.hits += 1
+            return value
+        db = self.db
+        if db is not None:
+            row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.stats.hits += 1
+                self.stats.disk_hits += 1
+                self.remember(key, row[0])
+                return row[0]
+        self.stats.misses += 1
+        value = self.func(text)
+        self.remember(key, value)
+        if db is not None:
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, fingerprint, value) VALUES (?, ?, ?)",
+                (key, self.fingerprint, value),
+            )
+        return value
+
+    def purge_stale(self) -> int:
+        """
+        Delete persistent entries written under other fingerprints, returns the number of rows deleted
+        """
+        db = self.db
+        if db is None:
+            return 0
+        return db.execute("DELETE FROM results WHERE fingerprint != ?", (self.fingerprint,)).rowcount
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.db is not None:
+            self.db.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+# `preprocess` between `denoise` and `normalize_whitespace`, split before `fold_amounts`
+UNFOLDED = Pipeline([STAGES["space_units_and_ranges"], STAGES["mask_contacts"]])
+FOLD = STAGES["fold_amounts"]
+# How a line can continue a match of the previous one, after the line break and whitespace:
+# phone digits and separators, and the right side of every `\s*` of the fold rules
+# (a line of just a range separator, "100\n-\n200 тыс", lets the island run on to the next one)
+PHONE_HEAD = re.compile(r"[\d()]|-[\d(]")
+ISLAND_HEAD = RULES.pattern(r"[\dд{island_initials}]|[-–—~]\s*(?:\d|$)", flags=re.IGNORECASE)
+
+@dataclass
+class LineCacheStats(CacheStats):
+    merged: int = 0 # lines processed together with their neighbours, uncached
+
+@dataclass(frozen=True, slots=True)
+class LineResult:
+    text: str         # after `denoise`
+    blank: bool       # whitespace only
+    bullet: bool      # a bullet, the blank lines before it are dropped
+    out: str          # `text` through UNFOLDED, FOLD and `space_lines`
+    noise: bool       # NOISE only before `space_lines`
+    # Whitespace aside, what the line starts and ends with:
+    head_digit: bool  # a digit, or 'о' that "от 100 до 200" -> "10–200" turns into one
+    head_phone: bool  # the above or PHONE_HEAD
+    head_island: bool # the above or ISLAND_HEAD
+    tail_phone: bool  # a digit, a paren or a hyphen
+    tail_range: bool  # the last letter of "от" or "до"
+    island_end: bool  # a numeric island runs to the end (after UNFOLDED)
+
+    def joins(self, following: "LineResult", island_end: bool) -> bool:
+        """
+        Whether a match can span the line break before `following`, `island_end` for this line's block:
+        a phone, "от"/"до" and a number, or a numeric island running on
+        """
+        return (
+            (self.tail_phone and following.head_phone)
+            or (self.tail_range and following.head_digit)
+            or (island_end and following.head_island)
+        )
+
+def process_block(text: str) -> tuple[str, bool, bool]:
+    """
+    Lines after `denoise` through the rest of `preprocess` but the text-level part of `normalize_whitespace`:
+    `(out, noise, island_end)`
+    """
+    text = UNFOLDED(text)
+    island_end = False
+    for island in NUMERIC_ISLAND.finditer(text):
+        island_end = island.end() == len(text)
+    text = FOLD(text)
+    return space_lines(text), not text.strip(NOISE), island_end
+
+class LineCache:
+    """
+    `preprocess` with an LRU of lines: channels append the same footers, signatures and contact lines
+    to every post, each distinct line goes through the stages once. Same output as `preprocess`,
+    the rules that look across lines are handled apart:
+    - the emoji bullet rule (a neighbour with the same leading emoji) and a bullet on the last line:
+      part of the key
+    - blank lines before a bullet, `\\n{3,}` collapse, edge and noise-only checks: applied to the whole text
+    - matches that can span a line break ("от 100\\nдо 200", "100\\nтыс", phones, see `LineResult.joins`):
+      the lines around it are processed together, uncached (`stats.merged`)
+    Misses cost more than `preprocess` (every stage runs per line): a win for sources that repeat
+    themselves, `stats.hit_rate` tells how much. Per process, like `Cache`.
+    """
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self.stats = LineCacheStats()
+        self.memory: OrderedDict[tuple[str, bool, bool], LineResult] = OrderedDict()
+        self.rules = RULES.digest # the lines are forgotten when another rule pack is installed
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.update(memory=OrderedDict(), stats=LineCacheStats())
+        return state
+
+    def line(self, line: str, cluster: str | None, shared: bool, last: bool) -> LineResult:
+        key = (line, shared, last)
+        result = self.memory.get(key)
+        if result is not None:
+            self.memory.move_to_end(key)
+            self.stats.hits += 1
+            return result
+        self.stats.misses += 1
+        text = unify_chars(replace_symbols(normalize_leading_emoji(line, cluster, cluster if shared else None, None)))
+        blank = not text or text.isspace()
+        bullet = False
+        if not blank and (m := BULLET.match(text if last else text + "\n")):
+            text, bullet = "-" + text[m.end():], True
+        out, noise, island_end = process_block(text)
+        stripped = text.strip()
+        head, tail = stripped[:1], stripped[-1:]
+        head_digit = head.isdecimal() or head in "оО\u1c82"
+        result = LineResult(
+            text, blank, bullet, out, noise,
+            head_digit=head_digit,
+            head_phone=head_digit or PHONE_HEAD.match(stripped) is not None,
+            head_island=head_digit or ISLAND_HEAD.match(stripped) is not None,
+            tail_phone=tail.isdecimal() or tail in "()-",
+            tail_range=tail in "тТ\u1c84\u1c85оО\u1c82",
+            island_end=island_end,
+        )
+        self.memory[key] = result
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+            self.stats.evictions += 1
+        return result
+
+    def __call__(self, text: str) -> str:
+        if self.rules != RULES.digest:
+            self.memory.clear()
+            self.rules = RULES.digest
+        lines = text.splitlines()
+        clusters = [get_leading_cluster(line) for line in lines]
+        results = []
+        for i, (line, cluster) in enumerate(zip(lines, clusters)):
+            shared = cluster is not None and (
+                (i > 0 and clusters[i - 1] == cluster) or (i + 1 < len(lines) and clusters[i + 1] == cluster)
+            )
+            results.append(self.line(line, cluster, shared, i + 1 == len(lines)))
+
+        outs: list[str] = []
+        noise = True
+        block: list[LineResult] = [] # lines since the last break no match can span
+        merged: tuple[str, bool, bool] | None = None # `process_block` of a block of several lines
+
+        def flush() -> None:
+            nonlocal noise
+            if len(block) == 1:
+                out, block_noise = block[0].out, block[0].noise
+            elif block:
+                out, block_noise, _ = merged or process_block("\n".join(result.text for result in block))
+                self.stats.merged += len(block)
+            else:
+                return
+            outs.append(out)
+            noise = noise and block_noise
+
+        blanks: list[LineResult] = []
+        for result in results:
+            if result.blank:
+                blanks.append(result)
+                continue
+            if result.bullet:
+                blanks = [] # `^\s*` of BULLET: swallowed by the bullet
+            if block and block[-1].joins(result, block[0].island_end if merged is None else merged[2]):
+                block += [*blanks, result]
+                merged = process_block("\n".join(result.text for result in block))
+            else:
+                flush()
+                for blank in blanks:
+                    block = [blank]
+                    flush()
+                block, merged = [result], None
+            blanks = []
+        flush()
+        for blank in blanks:
+            block = [blank]
+            flush()
+        return "" if noise else collapse_lines("\n".join(outs))
@@ -1,7 +1,11 @@
 import unicodedata
 import re
+from functools import lru_cache
+from typing import Iterable, Iterator, TypeVar
 import regex
 
+T = TypeVar("T")
+
 ALNUM = re.compile(r"[а-яa-z0-9]", flags=re.IGNORECASE)
 NBRSPACE = re.compile(r"\u00A0+")
 MDASH = re.compile(r"—")
@@ -11,6 +15,21 @@ INTRA_SPACE = re.compile(r"(?<=\S)[ \t]{2,}(?=\S)", flags=re.MULTILINE)
 NEWLINES = re.compile(r"\n{3,}")
 BULLET = re.compile(r"^\s*[-–◦•·*+](?=[\s\w])", flags=re.MULTILINE)
 ASTERISKS = re.compile(r"(?:\*{2,}|={2,}|-{2,}|_{2,})", flags=re.VERBOSE)
+ZW_JOINERS = re.compile(r"[\u200C\u200D]")
+ZW_SPACE = re.compile(r"[\u200B]")
+ZW_LINEBREAKS = re.compile(r"[\u2028\u2029]")
+GRAPHEME = regex.compile(r"\X")
+# "Plain" codepoints are non-symbols that always form a grapheme cluster of their own,
+# unless followed by an extending codepoint. Runs of them can be skipped without segmentation.
+PLAIN = r"[[\p{GCB=Other}\p{GCB=Control}\p{GCB=LF}]--\p{S}]"
+EXTENDER = r"[\p{GCB=Extend}\p{GCB=ZWJ}\p{GCB=SpacingMark}]"
+NON_PLAIN = regex.compile(rf"[^{PLAIN}]", flags=regex.V1)
+PLAIN_HEAD = regex.compile(rf"{PLAIN}(?!{EXTENDER})", flags=regex.V1)
+PLAIN_RUN_OR_GRAPHEME = regex.compile(rf"({PLAIN}+(?!{EXTENDER}))|\X", flags=regex.V1)
+# `normalize_whitespace` returns "" for texts made of these only
+NOISE = " \t\n\r\f\v-–,./;'[]{}()_=+!@#$%^&*~\\"
+# ... and strips these from the edges of the result
+EDGES = " \t\n\r\f\v-–=*"
 
 def normalize_whitespace(text: str) -> str:
     """
@@ -20,17 +39,30 @@ def normalize_whitespace(text: str) -> str:
     4. Collapse 3+ newlines into 2 newlines
     5. Strip text-level leading/trailing spaces
     """
-    if not text.strip(" \t\n\r\f\v-–,./;'[]{}()_=+!@#$%^&*~\\"):
+    if not text.strip(NOISE):
         return ""
+    return collapse_lines(space_lines(text))
+
+def space_lines(text: str) -> str:
+    """
+    Line-level part of `normalize_whitespace`, never spans lines
+    """
     text = INIT_SPACE.sub("  ", text)
     text = INTRA_SPACE.sub(" ", text)
     text = TRAIL_SPACE.sub("", text)
+    return text
+
+def collapse_lines(text: str) -> str:
+    """
+    Text-level part of `normalize_whitespace`: blank line runs, trailing whitespace and the edges
+    """
     text = NEWLINES.sub("\n\n", text)
     text = "\n".join(
         line.rstrip() for line in text.splitlines()
     )
-    return text.strip(" \t\n\r\f\v-–=*")
+    return text.strip(EDGES)
 
+@lru_cache(maxsize=65536)
 def is_symbol_like(cluster: str) -> bool:
     if len(cluster) > 1:
         # Is a multi-codepoint cluster
@@ -54,7 +86,10 @@ def get_leading_cluster(text: str) -> str | None:
     stripped = text.lstrip()
     if not stripped:
         return None
-    m = regex.match(r"\X", stripped) # captures a grapheme (one or more "codepoints")
+    if PLAIN_HEAD.match(stripped):
+        # Fast path: a single-codepoint non-symbol cluster
+        return None
+    m = GRAPHEME.match(stripped) # captures a grapheme (one or more "codepoints")
     if not m:
         return None
     cluster = m.group(0)
@@ -63,43 +98,59 @@ def get_leading_cluster(text: str) -> str | None:
     return None
 
 def normalize_leading_emojis(text: str) -> str:
+    if not NON_PLAIN.search(text, concurrent=True):
+        # Fast path: no line can start with a symbol-like cluster
+        return "\n".join(text.splitlines())
     in_lines = text.splitlines()
     leading_clusters: list[str | None] = [
         get_leading_cluster(line) for line in in_lines
     ]
     out_lines: list[str] = []
     for i, line in enumerate(in_lines):
-        leading_cluster = leading_clusters[i]
-        if not leading_cluster:
-            # No leading emoji, nothing to do
-            out_lines.append(line)
-            continue
-        line = line.strip()
-        # print(">>>", repr(line))
-        prev_same = i > 0 and leading_clusters[i - 1] == leading_cluster
-        next_same = i < len(in_lines) - 1 and leading_clusters[i + 1] == leading_cluster
-        content = line.lstrip()[len(leading_cluster):]
-        if prev_same or next_same:
-            # Bullet-like emoji, replace with hyphen
-            out_lines.append(f"- {content.rstrip()}" if content.rstrip() else "")
-        else:
-            # Other emoji, drop it
-            out_lines.append(content.strip())
+        prev_cluster = leading_clusters[i - 1] if i > 0 else None
+        next_cluster = leading_clusters[i + 1] if i < len(in_lines) - 1 else None
+        out_lines.append(normalize_leading_emoji(line, leading_clusters[i], prev_cluster, next_cluster))
     return "\n".join(out_lines)
 
+def normalize_leading_emoji(
+    line: str, leading_cluster: str | None, prev_cluster: str | None, next_cluster: str | None
+) -> str:
+    """
+    One line of `normalize_leading_emojis`, given the leading clusters of it and its neighbours
+    """
+    if not leading_cluster:
+        # No leading emoji, nothing to do
+        return line
+    line = line.strip()
+    content = line.lstrip()[len(leading_cluster):]
+    if prev_cluster == leading_cluster or next_cluster == leading_cluster:
+        # Bullet-like emoji, replace with hyphen
+        return f"- {content.rstrip()}" if content.rstrip() else ""
+    # Other emoji, drop it
+    return content.strip()
+
+def replace_symbol_like(match: regex.Match) -> str:
+    if match.group(1) is not None:
+        # A run of plain codepoints, kept as is
+        return match.group(1)
+    cluster = match.group(0)
+    return " " if is_symbol_like(cluster) else cluster
+
+def replace_symbols(text: str) -> str:
+    if not NON_PLAIN.search(text, concurrent=True):
+        return text
+    # Grapheme segmentation only happens around rare emoji/symbol clusters
+    return PLAIN_RUN_OR_GRAPHEME.sub(replace_symbol_like, text, concurrent=True)
+
 def clean_unicode(text: str) -> str:
     text = normalize_leading_emojis(text)
-    text = regex.sub(r"\X", lambda m: " " if is_symbol_like(m.group(0)) else m.group(0), text)
+    text = replace_symbols(text)
     return text
 
-def denoise(text: str) -> str:
+def unify_chars(text: str) -> str:
     """
-    Unify local mess so other algorithms can be simplified
+    Character-level part of `denoise`, never spans lines
     """
-    # Handle Unicode
-    text = clean_unicode(text)
-    # Normalize linebreaks
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
     # Replace NBRSPACE with normal space
     text = NBRSPACE.sub(" ", text)
     # Replace MDASH with normal NDASH
@@ -107,11 +158,133 @@ def denoise(text: str) -> str:
     # Replace common decorative chars
     text = ASTERISKS.sub("", text)
     # Remove zero-width "non-joiner" and zero-width "joiner"
-    text = re.sub(r"[\u200C\u200D]", "", text)
+    text = ZW_JOINERS.sub("", text)
     # Replace zero-width spaces with normal ones
-    text = re.compile(r"[\u200B]").sub(" ", text)
+    text = ZW_SPACE.sub(" ", text)
     # Replace zero-width linebreaks with normal ones
-    text = re.compile(r"[\u2028\u2029]").sub("\n", text)
+    text = ZW_LINEBREAKS.sub("\n", text)
+    return text
+
+def denoise(text: str) -> str:
+    """
+    Unify local mess so other algorithms can be simplified
+    """
+    # Handle Unicode
+    text = clean_unicode(text)
+    # Normalize linebreaks
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    # Replace NBRSPACE, MDASH, decorative and zero-width chars
+    text = unify_chars(text)
     # Unify bullets
     text = BULLET.sub("-", text)
     return text
+
+# Streaming variants ------------------------------------------------------------------------------
+# They take the text as an iterable of chunks (e.g. an open file, which yields lines) and yield
+# the lines of the result: `"\n".join(denoise_lines(chunks)) == denoise("".join(chunks))`.
+# Memory is bounded by the longest line (plus runs of blank or separator-only lines), not the text.
+
+def with_last(items: Iterable[T]) -> Iterator[tuple[T, bool]]:
+    it = iter(items)
+    for current in it:
+        for following in it:
+            yield current, False
+            current = following
+        yield current, True
+
+def split_newlines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Lines of the concatenated chunks as `text.split("\\n")` returns them
+    """
+    pending: list[str] = []
+    for chunk in chunks:
+        parts = chunk.split("\n")
+        if len(parts) > 1:
+            pending.append(parts[0])
+            yield "".join(pending)
+            yield from parts[1:-1]
+            pending.clear()
+        pending.append(parts[-1])
+    yield "".join(pending)
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Lines of the concatenated chunks as `text.splitlines()` returns them
+    """
+    for line, last in with_last(split_newlines(chunks)):
+        # The "\n" completes a "\r\n" and terminates a trailing "\v", " ", etc. like in the full text
+        yield from (line if last else line + "\n").splitlines()
+
+def clean_unicode_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Streaming `clean_unicode`: a one-line lookahead is enough for the emoji bullet rule
+    """
+    prev_cluster = None
+    lines = iter_lines(chunks)
+    for line in lines:
+        cluster = get_leading_cluster(line)
+        for following in lines:
+            next_cluster = get_leading_cluster(following)
+            yield replace_symbols(normalize_leading_emoji(line, cluster, prev_cluster, next_cluster))
+            prev_cluster, line, cluster = cluster, following, next_cluster
+        yield replace_symbols(normalize_leading_emoji(line, cluster, prev_cluster, None))
+
+def denoise_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Streaming `denoise`
+    """
+    blank: list[str] = [] # whitespace-only lines, a bullet right after them swallows them (`^\s*` in BULLET)
+    for line, last in with_last(clean_unicode_lines(chunks)):
+        line = unify_chars(line)
+        if line.isspace() or not line:
+            blank.append(line)
+            continue
+        if m := BULLET.match(line if last else line + "\n"):
+            blank.clear()
+            line = "-" + line[m.end():]
+        yield from blank
+        blank.clear()
+        yield line
+    yield from blank
+
+def normalize_whitespace_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Streaming `normalize_whitespace`, e.g. `normalize_whitespace_lines(line + "\\n" for line in denoise_lines(file))`
+    """
+    noise_only = True # output waits in `waiting` until the text is known to be more than NOISE
+    waiting: list[str] = []
+    started = False # the first line with more than EDGES is found, preceding ones are stripped
+    held: list[str] = [] # the last line with more than EDGES and the lines after it, stripped at the end
+    empty = 0 # run of empty lines, 2+ are collapsed into one (`\n{3,}` -> `\n\n`)
+
+    def release(lines: list[str]) -> Iterator[str]:
+        if noise_only:
+            waiting.extend(lines)
+        else:
+            yield from waiting
+            waiting.clear()
+            yield from lines
+
+    for line in split_newlines(chunks):
+        noise_only = noise_only and not line.strip(NOISE)
+        line = space_lines(line)
+        if not line:
+            empty += 1
+            continue
+        # Leading and trailing empty lines are stripped anyway, so one empty line for any run
+        pieces = [""] * min(empty, 1) + (line + "\n").splitlines()
+        empty = 0
+        for piece in pieces:
+            piece = piece.rstrip()
+            if not piece.strip(EDGES):
+                if started:
+                    held.append(piece)
+            elif started:
+                yield from release(held)
+                held = [piece]
+            else:
+                started = True
+                held = [piece.lstrip(EDGES)]
+        yield from release([])
+    if held and not noise_only:
+        yield from release([held[0].rstrip(EDGES)])
@@ -0,0 +1,115 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import deque
+from typing import Iterable, Iterator, TextIO
+from .batch import preprocess_many
+from .pipeline import STAGES, Pipeline
+from .rules import export_packs
+
+class Stats:
+    def __init__(self):
+        self.records = 0
+        self.skipped = 0 # records passed through as they are: the field is missing or not a string
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    def report(self, file: TextIO) -> None:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        skipped = f" ({self.skipped} passed through: field missing or not a string)" if self.skipped else ""
+        print(
+            f"{self.records} records{skipped}, {self.bytes / 1e6:.1f} MB in {elapsed:.2f}s: "
+            f"{self.records / elapsed:.0f} records/sec, {self.bytes / 1e6 / elapsed:.2f} MB/sec",
+            file=file,
+        )
+
+def counted_lines(stream: TextIO, stats: Stats) -> Iterator[str]:
+    for line in stream:
+        stats.bytes += len(line.encode("utf-8"))
+        yield line
+
+def read_jsonl(lines: Iterable[str]) -> Iterator[dict]:
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+def parse_chain(value: str) -> Pipeline:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in STAGES]
+    if not names or unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown stage(s) {', '.join(unknown) or '-'}, expected some of: {', '.join(STAGES)}"
+        )
+    return Pipeline(STAGES[name] for name in names)
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="textutils",
+        description="Apply a chain of textutils stages to a field of JSONL/CSV records (stdin -> stdout)",
+    )
+    parser.add_argument("input", nargs="?", default="-", help="input file, '-' for stdin (default)")
+    parser.add_argument("-f", "--format", choices=["jsonl", "csv"], help="input format (default: by extension, else jsonl)")
+    parser.add_argument("--field", default="text", help="field to process (default: text)")
+    parser.add_argument("--output-field", help="field to write the result to (default: overwrite --field)")
+    parser.add_argument("-s", "--stages", type=parse_chain, default=parse_chain("preprocess"),
+                        help="comma-separated stages, e.g. denoise,mask_contacts,bucket_numbers (default: preprocess)")
+    parser.add_argument("-w", "--workers", type=int, help="worker processes (default: number of cores)")
+    parser.add_argument("--chunksize", type=int, default=256, help="records per worker task (default: 256)")
+    parser.add_argument("-r", "--rules", action="append", default=[], metavar="PACK",
+                        help="rule pack (.toml or .json) extending the default vocabulary, repeatable")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't print throughput to stderr")
+    return parser
+
+def main(argv: list[str] | None = None) -> int:
+    args = make_parser().parse_args(argv)
+    if args.rules:
+        export_packs(*args.rules)
+    format = args.format or ("csv" if args.input.endswith(".csv") else "jsonl")
+    output_field = args.output_field or args.field
+    stats = Stats()
+    infile = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8", newline="")
+    try:
+        lines = counted_lines(infile, stats)
+        if format == "csv":
+            reader = csv.DictReader(lines)
+            fieldnames = list(reader.fieldnames or [])
+            if output_field not in fieldnames:
+                fieldnames.append(output_field)
+            writer = csv.DictWriter(sys.stdout, fieldnames=fieldnames)
+            writer.writeheader()
+            records: Iterator[dict] = reader
+            write = writer.writerow
+        else:
+            records = read_jsonl(lines)
+            write = lambda record: sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        # Records wait here while their texts are in flight, so memory is bounded by the pool window.
+        # A record whose field is missing or not a string takes its place in the window with an empty text
+        # and is written as is, so a long run of them isn't buffered here.
+        pending: deque[tuple[dict, bool]] = deque()
+        def texts() -> Iterator[str]:
+            for record in records:
+                text = record.get(args.field) if isinstance(record, dict) else None
+                pending.append((record, isinstance(text, str)))
+                yield text if isinstance(text, str) else ""
+
+        for result in preprocess_many(texts(), args.stages, workers=args.workers, chunksize=args.chunksize):
+            record, has_text = pending.popleft()
+            if has_text:
+                record[output_field] = result
+            else:
+                stats.skipped += 1
+            write(record)
+            stats.records += 1
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+    sys.stdout.flush()
+    if not args.quiet:
+        stats.report(sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Callable
+from .cache import describe
+from .cli import parse_chain
+from .pipeline import preprocess
+from .rules import RULES, export_packs, install
+
+def write_atomic(path: str, data: bytes) -> None:
+    """
+    Replace `path` with `data` so that readers (and a crash) only ever see the old or the new content
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+@dataclass(frozen=True, eq=False)
+class RecordIndex:
+    """
+    Byte offsets of every `stride`-th record (line) of a JSONL file: 8 bytes per `stride` records,
+    enough to cut tens of GB into record-aligned shards. Built with one pass over the memory-mapped
+    file and cached next to it (`<path>.idx`) until the file changes.
+    """
+    size: int
+    mtime_ns: int
+    stride: int
+    records: int
+    offsets: array # offsets[i]: start of record i * stride
+
+    @classmethod
+    def build(cls, path: str, stride: int = 1024) -> "RecordIndex":
+        stat = os.stat(path)
+        offsets, records, pos = array("Q"), 0, 0
+        if stat.st_size:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                find = mm.find
+                while pos < stat.st_size:
+                    if records % stride == 0:
+                        offsets.append(pos)
+                    end = find(b"\n", pos)
+                    pos = stat.st_size if end < 0 else end + 1
+                    records += 1
+        return cls(stat.st_size, stat.st_mtime_ns, stride, records, offsets)
+
+    @classmethod
+    def open(cls, path: str, stride: int = 1024) -> "RecordIndex":
+        """
+        The cached index of `path` if it is still valid, else a new one (cached when the directory is writable)
+        """
+        stat = os.stat(path)
+        try:
+            with open(f"{path}.idx", "rb") as f:
+                meta = json.loads(f.readline())
+                if (meta["size"], meta["mtime_ns"], meta["stride"]) == (stat.st_size, stat.st_mtime_ns, stride):
+                    offsets = array("Q")
+                    offsets.frombytes(f.read())
+                    return cls(meta["size"], meta["mtime_ns"], stride, meta["records"], offsets)
+        except (OSError, ValueError, KeyError):
+            pass
+        index = cls.build(path, stride)
+        meta = {"size": index.size, "mtime_ns": index.mtime_ns, "stride": stride, "records": index.records}
+        try:
+            write_atomic(f"{path}.idx", json.dumps(meta).encode("utf-8") + b"\n" + index.offsets.tobytes())
+        except OSError:
+            pass
+        return index
+
+@dataclass(frozen=True)
+class Shard:
+    number: int
+    start: int # byte range [start, end) of whole records
+    end: int
+    records: int
+
+def plan_shards(index: RecordIndex, count: int) -> list[Shard]:
+    """
+    Cut the indexed file into at most `count` shards of about the same size in bytes.
+    The plan only depends on the file and `count`, so every machine computes the same one.
+    """
+    cuts = [0]
+    for k in range(1, count):
+        target = index.size * k // count
+        # first indexed offset at or past the target
+        lo, hi = cuts[-1], len(index.offsets)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if index.offsets[mid] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(index.offsets) and lo > cuts[-1]:
+            cuts.append(lo)
+    shards = []
+    for number, (first, last) in enumerate(zip(cuts, [*cuts[1:], None])):
+        start = index.offsets[first] if index.offsets else 0
+        end = index.size if last is None else index.offsets[last]
+        records = (index.records if last is None else last * index.stride) - first * index.stride
+        shards.append(Shard(number, start, end, records))
+    return shards
+
+@dataclass
+class Checkpoint:
+    offset: int  # input offset of the next record
+    records: int # records done
+    written: int # output bytes, anything past it is from an interrupted run
+    done: bool = False
+
+@dataclass
+class ShardStats:
+    shard: Shard
+    resumed: int = 0 # records already done by a previous run
+    records: int = 0
+    skipped: int = 0 # records written as they are: the field is missing or not a string
+    bytes: int = 0
+    seconds: float = 0.0
+    done: bool = False
+
+    def __str__(self) -> str:
+        seconds = max(self.seconds, 1e-9)
+        total = self.resumed + self.records
+        return (
+            f"shard {self.shard.number}: {total}/{self.shard.records} records{' (done)' if self.done else ''}, "
+            f"{self.bytes / 1e6:.1f} MB in {self.seconds:.2f}s: "
+            f"{self.records / seconds:.0f} records/sec, {self.bytes / 1e6 / seconds:.2f} MB/sec"
+            + (f", resumed at {self.resumed}" if self.resumed else "")
+            + (f", {self.skipped} passed through" if self.skipped else "")
+        )
+
+def report(stats: ShardStats) -> None:
+    print(stats, file=sys.stderr, flush=True)
+
+def shard_paths(out_dir: str, shard: Shard) -> tuple[str, str]:
+    name = os.path.join(out_dir, f"shard-{shard.number:05d}")
+    return f"{name}.jsonl", f"{name}.checkpoint.json"
+
+def run_shard(
+    path: str,
+    out_dir: str,
+    shard: Shard,
+    func: Callable[[str], str] = preprocess,
+    *,
+    field: str = "text",
+    output_field: str | None = None,
+    checkpoint_every: int = 1000,
+    progress: Callable[[ShardStats], None] | None = report,
+) -> ShardStats:
+    """
+    Process the records of `shard` into `<out_dir>/shard-NNNNN.jsonl`, saving a checkpoint every
+    `checkpoint_every` records: a rerun after a crash continues from the last one
+    """
+    output_path, checkpoint_path = shard_paths(out_dir, shard)
+    output_field = output_field or field
+    try:
+        with open(checkpoint_path, "rb") as f:
+            checkpoint = Checkpoint(**json.loads(f.read()))
+    except FileNotFoundError:
+        checkpoint = Checkpoint(shard.start, 0, 0)
+    stats = ShardStats(shard, resumed=checkpoint.records, done=checkpoint.done)
+    if checkpoint.done or shard.start == shard.end:
+        stats.done = True
+        return stats
+
+    def save() -> None:
+        out.flush()
+        os.fsync(out.fileno())
+        write_atomic(checkpoint_path, json.dumps(asdict(checkpoint)).encode("utf-8"))
+        stats.seconds = time.perf_counter() - started
+        if progress is not None:
+            progress(stats)
+
+    started = time.perf_counter()
+    with (
+        open(path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        open(output_path, "ab") as out,
+    ):
+        out.truncate(checkpoint.written)
+        pos = checkpoint.offset
+        while pos < shard.end:
+            end = mm.find(b"\n", pos, shard.end)
+            end = shard.end if end < 0 else end + 1
+            line = mm[pos:end]
+            if line.strip():
+                record = json.loads(line)
+                text = record.get(field) if isinstance(record, dict) else None
+                if isinstance(text, str):
+                    record[output_field] = func(text)
+                else:
+                    stats.skipped += 1
+                checkpoint.written += out.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+            stats.records += 1
+            stats.bytes += end - pos
+            checkpoint.offset, checkpoint.records = end, checkpoint.records + 1
+            pos = end
+            if stats.records % checkpoint_every == 0:
+                save()
+        checkpoint.done = stats.done = True
+        save()
+    return stats
+
+def run_corpus(
+    path: str,
+    out_dir: str,
+    func: Callable[[str], str] = preprocess,
+    *,
+    shards: int = 1,
+    only: list[int] | None = None,
+    workers: int = 1,
+    field: str = "text",
+    output_field: str | None = None,
+    checkpoint_every: int = 1000,
+    stride: int = 1024,
+    progress: Callable[[ShardStats], None] | None = report,
+) -> list[ShardStats]:
+    """
+    Run `func` over the `field` of a JSONL file in `shards` byte-range shards, `workers` shards at a time:
+    - `only`: shard numbers to run here, e.g. one machine takes 0-7, another 8-15 of the same plan
+    - `<out_dir>/plan.json` pins the plan, the chain, the fields and the rule pack: rerunning resumes
+      unfinished shards and skips finished ones, rerunning with any of them changed is refused
+    - concatenating `shard-*.jsonl` in order gives the records in input order (blank lines dropped)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    index = RecordIndex.open(path, stride)
+    plan = plan_shards(index, shards)
+    meta = {
+        "input": os.path.abspath(path), "size": index.size, "mtime_ns": index.mtime_ns, "shards": [asdict(s) for s in plan],
+        "chain": describe(func), "field": field, "output_field": output_field or field, "rules": RULES.digest,
+    }
+    plan_path = os.path.join(out_dir, "plan.json")
+    try:
+        with open(plan_path, "rb") as f:
+            planned = json.loads(f.read())
+        if changed := [key for key in meta if planned.get(key) != meta[key]]:
+            raise ValueError(f"{out_dir} holds a run with another {', '.join(changed)}, use a fresh output directory")
+    except FileNotFoundError:
+        write_atomic(plan_path, json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    selected = [shard for shard in plan if only is None or shard.number in only]
+    args = dict(field=field, output_field=output_field, checkpoint_every=checkpoint_every, progress=progress)
+    if workers == 1:
+        return [run_shard(path, out_dir, shard, func, **args) for shard in selected]
+    with ProcessPoolExecutor(max_workers=workers, initializer=install, initargs=(RULES.compiled,)) as pool:
+        futures = [pool.submit(run_shard, path, out_dir, shard, func, **args) for shard in selected]
+        return [future.result() for future in futures]
+
+def parse_numbers(value: str) -> list[int]:
+    """
+    "0-3,8" -> [0, 1, 2, 3, 8]
+    """
+    numbers = []
+    for part in value.split(","):
+        first, _, last = part.strip().partition("-")
+        numbers.extend(range(int(first), int(last or first) + 1))
+    return numbers
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m textutils.corpus",
+        description="Apply a chain of textutils stages to a field of a large JSONL file, in resumable shards",
+    )
+    parser.add_argument("input", help="input JSONL file")
+    parser.add_argument("output", help="output directory: shard-NNNNN.jsonl, checkpoints and plan.json")
+    parser.add_argument("--field", default="text", help="field to process (default: text)")
+    parser.add_argument("--output-field", help="field to write the result to (default: overwrite --field)")
+    parser.add_argument("-s", "--stages", type=parse_chain, default=parse_chain("preprocess"),
+                        help="comma-separated stages, e.g. denoise,mask_contacts,bucket_numbers (default: preprocess)")
+    parser.add_argument("-n", "--shards", type=int, default=os.cpu_count() or 1, help="shards in the plan (default: number of cores)")
+    parser.add_argument("--only", type=parse_numbers, help="shards to run here, e.g. 0-7 (default: all)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="shards processed at a time (default: number of cores)")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, help="records between checkpoints (default: 1000)")
+    parser.add_argument("-r", "--rules", action="append", default=[], metavar="PACK",
+                        help="rule pack (.toml or .json) extending the default vocabulary, repeatable")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't print progress to stderr")
+    return parser
+
+def main(argv: list[str] | None = None) -> int:
+    args = make_parser().parse_args(argv)
+    if args.rules:
+        export_packs(*args.rules)
+    started = time.perf_counter()
+    results = run_corpus(
+        args.input, args.output, args.stages,
+        shards=args.shards, only=args.only, workers=args.workers, field=args.field, output_field=args.output_field,
+        checkpoint_every=args.checkpoint_every, progress=None if args.quiet else report,
+    )
+    if not args.quiet:
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        records, size = sum(s.records for s in results), sum(s.bytes for s in results)
+        print(
+            f"{len(results)} shards, {records} records, {size / 1e6:.1f} MB in {elapsed:.2f}s: "
+            f"{records / elapsed:.0f} records/sec, {size / 1e6 / elapsed:.2f} MB/sec",
+            file=sys.stderr,
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
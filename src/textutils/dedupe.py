@@ -0,0 +1,189 @@
+import json
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from math import isqrt
+from typing import Callable, Hashable
+import numpy as np
+from .pipeline import VIEWS
+
+# Masked and bucketed: reposts with another phone or a slightly different salary look the same
+NORMALIZE = VIEWS.views["dedupe"]
+WORD = re.compile(r"\w+")
+EMPTY = np.uint32(0xFFFFFFFF) # every slot of the signature of a text without words
+FNV_PRIME = np.uint64(0x100000001B3)
+CHUNK = 4096 # shingles hashed at once, bounds the temporary (num_perm, CHUNK) array
+
+def shingles(text: str, size: int = 3) -> set[str]:
+    """
+    Word `size`-grams of the casefolded text, texts shorter than `size` words are a single shingle
+    """
+    words = WORD.findall(text.casefold())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+@dataclass(frozen=True, eq=False)
+class MinHasher:
+    """
+    MinHash signature of a text: for each of `num_perm` multiply-shift hash functions, the minimum
+    over the CRC32 of the shingles of the normalized text. The share of equal slots of two signatures
+    estimates the Jaccard similarity of their shingle sets. Picklable, so `preprocess_many(texts, hasher)`
+    computes signatures in worker processes.
+    """
+    a: np.ndarray # (num_perm,) uint64, odd
+    b: np.ndarray # (num_perm,) uint64
+    shingle_size: int = 3
+    normalize: Callable[[str], str] = NORMALIZE
+
+    @classmethod
+    def create(
+        cls, num_perm: int = 64, seed: int = 0, shingle_size: int = 3, normalize: Callable[[str], str] = NORMALIZE,
+    ) -> "MinHasher":
+        rng = np.random.default_rng(seed)
+        a = rng.integers(0, 2**64, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        b = rng.integers(0, 2**64, size=num_perm, dtype=np.uint64)
+        return cls(a, b, shingle_size, normalize)
+
+    @property
+    def num_perm(self) -> int:
+        return len(self.a)
+
+    def __call__(self, text: str) -> np.ndarray:
+        found = shingles(self.normalize(text), self.shingle_size)
+        signature = np.full(self.num_perm, EMPTY, dtype=np.uint32)
+        if not found:
+            return signature
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in found), dtype=np.uint64, count=len(found))
+        a, b = self.a[:, None], self.b[:, None]
+        for i in range(0, len(hashes), CHUNK):
+            chunk = (a * hashes[None, i:i + CHUNK] + b) >> np.uint64(32) # wraps mod 2**64 by design
+            signature = np.minimum(signature, chunk.min(axis=1).astype(np.uint32))
+        return signature
+
+class DuplicateIndex:
+    """
+    MinHash LSH index of near-duplicate texts, with incremental inserts and sub-linear queries:
+    - signatures are split into `bands`, texts sharing any band are candidates, candidates with
+      estimated Jaccard similarity >= `threshold` are duplicates
+    - signatures live in one growable uint32 array, band keys in one sorted uint64 array
+      (band << 32 | band hash) searched with `np.searchsorted`
+    - recent inserts are scanned directly until there are about 4 * sqrt(n) of them,
+      then merged into the sorted array, so inserts are amortized cheap
+    - `save`/`load` persist everything to a single `.npz` file (keys as JSON: ints and strings)
+    Needs NumPy (`pip install leadscanr-utils[numpy]`).
+    """
+    def __init__(self, hasher: MinHasher | None = None, *, bands: int = 16, threshold: float = 0.8):
+        self.hasher = hasher or MinHasher.create()
+        if self.hasher.num_perm % bands:
+            raise ValueError(f"num_perm ({self.hasher.num_perm}) must be divisible by bands ({bands})")
+        self.bands = bands
+        self.threshold = threshold
+        self.keys: list[Hashable] = []
+        self.signatures = np.empty((1024, self.hasher.num_perm), dtype=np.uint32)
+        self.table_keys = np.empty(0, dtype=np.uint64) # sorted band keys of rows [0, indexed)
+        self.table_rows = np.empty(0, dtype=np.int32)
+        self.indexed = 0
+        self.recent_keys = np.empty((1024, bands), dtype=np.uint64) # band keys of rows [indexed, n)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """
+        (n, bands) uint64 keys of the bands of (n, num_perm) signatures
+        """
+        rows = signatures.reshape(len(signatures), self.bands, -1).astype(np.uint64)
+        h = np.zeros(rows.shape[:2], dtype=np.uint64)
+        for i in range(rows.shape[2]):
+            h = (h ^ rows[:, :, i]) * FNV_PRIME
+        return (np.arange(self.bands, dtype=np.uint64) << np.uint64(32)) | (h >> np.uint64(32))
+
+    def merge(self) -> None:
+        """
+        Move recent inserts into the sorted band table
+        """
+        rows = np.arange(self.indexed, len(self), dtype=np.int32)
+        keys = self.recent_keys[:len(rows)]
+        indexable = self.signatures[rows, 0] != EMPTY # texts without words aren't anybody's duplicates
+        keys = keys[indexable].ravel()
+        rows = np.repeat(rows[indexable], self.bands)
+        order = np.argsort(keys, kind="stable")
+        keys, rows = keys[order], rows[order]
+        at = np.searchsorted(self.table_keys, keys, side="right")
+        self.table_keys = np.insert(self.table_keys, at, keys)
+        self.table_rows = np.insert(self.table_rows, at, rows)
+        self.indexed = len(self)
+
+    def add(self, key: Hashable, text: str | None = None, *, signature: np.ndarray | None = None) -> None:
+        """
+        Index `text` (or its precomputed `signature`) under `key`
+        """
+        if signature is None:
+            signature = self.hasher(text or "")
+        n = len(self)
+        if n == len(self.signatures):
+            self.signatures = np.concatenate([self.signatures, np.empty_like(self.signatures)])
+        if n - self.indexed == len(self.recent_keys):
+            self.recent_keys = np.concatenate([self.recent_keys, np.empty_like(self.recent_keys)])
+        self.signatures[n] = signature
+        self.recent_keys[n - self.indexed] = self.band_keys(signature[None])[0]
+        self.keys.append(key)
+        if len(self) - self.indexed >= max(4096, 4 * isqrt(len(self))):
+            self.merge()
+
+    def candidates(self, signature: np.ndarray) -> np.ndarray:
+        query = self.band_keys(signature[None])[0]
+        lo = np.searchsorted(self.table_keys, query, side="left")
+        hi = np.searchsorted(self.table_keys, query, side="right")
+        found = [self.table_rows[i:j] for i, j in zip(lo, hi) if j > i]
+        if self.indexed < len(self):
+            recent = self.recent_keys[:len(self) - self.indexed]
+            found.append(np.flatnonzero((recent == query).any(axis=1)).astype(np.int32) + self.indexed)
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int32)
+
+    def query(self, text: str | None = None, *, signature: np.ndarray | None = None) -> list[tuple[Hashable, float]]:
+        """
+        `(key, estimated similarity)` of the indexed near-duplicates of `text`, most similar first
+        """
+        if signature is None:
+            signature = self.hasher(text or "")
+        if signature[0] == EMPTY:
+            return []
+        rows = self.candidates(signature)
+        similarity = (self.signatures[rows] == signature).mean(axis=1)
+        keep = similarity >= self.threshold
+        rows, similarity = rows[keep], similarity[keep]
+        order = np.argsort(-similarity, kind="stable")
+        return [(self.keys[row], float(similarity[i])) for i, row in zip(order, rows[order])]
+
+    def save(self, path: str | os.PathLike) -> None:
+        self.merge()
+        meta = {"bands": self.bands, "threshold": self.threshold, "shingle_size": self.hasher.shingle_size}
+        np.savez(
+            path,
+            meta=np.array(json.dumps(meta)),
+            a=self.hasher.a,
+            b=self.hasher.b,
+            keys=np.array(json.dumps(self.keys, ensure_ascii=False)),
+            signatures=self.signatures[:len(self)],
+            table_keys=self.table_keys,
+            table_rows=self.table_rows,
+        )
+
+    @classmethod
+    def load(cls, path: str | os.PathLike, normalize: Callable[[str], str] = NORMALIZE) -> "DuplicateIndex":
+        """
+        Index saved by `save`, `normalize` must be the one it was built with (not persisted)
+        """
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            hasher = MinHasher(data["a"], data["b"], meta["shingle_size"], normalize)
+            index = cls(hasher, bands=meta["bands"], threshold=meta["threshold"])
+            index.keys = json.loads(str(data["keys"]))
+            index.signatures = data["signatures"].copy() if len(index.keys) else index.signatures
+            index.table_keys = data["table_keys"]
+            index.table_rows = data["table_rows"]
+        index.indexed = len(index.keys)
+        return index
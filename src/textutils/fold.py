@@ -1,57 +1,192 @@
 import re
+from dataclasses import dataclass
+from .rules import RULES
+from .trace import sub
 
-def fold_shortcuts(text: str) -> str:
-    text = re.sub(
-        r"""
-        (\d+)     # integer number
-        \s*       # optional space
-        тр\.?     # 'тр.'
-        (?=\W|$)  # followed by non-word or end
-        """,
-        r"\1 тыс. ₽",
-        text,
-        flags=re.IGNORECASE | re.VERBOSE,
-    )
-    return text
-
-def fold_numbers(text: str) -> str:
-    pattern = r"\b\d{1,3}(?:[.,`' ]\d{3})+\b"
-    text = re.sub(pattern, lambda m: "".join(c for c in m.group(0) if c.isdigit()), text)
-    text = re.sub(r"(?<=00)\s+[-–]\s+(?=\d)", "–", text)
-    return text
-
-def fold_scale_units(text: str) -> str:
-    pattern = r"""
+# The words of these rules come from the installed rule pack (`rules.DEFAULT_PACK`), one pattern for all of them
+SHORTCUT = RULES.pattern(
+    r"""
+    (?<!\d)                  # start of the number (starts inside it can't match first)
+    (\d+)                    # integer number
+    \s*                      # optional space
+    (?P<word>{shortcuts})\.? # 'тр.'
+    (?=\W|$)                 # followed by non-word or end
+    """,
+    flags=re.IGNORECASE | re.VERBOSE,
+)
+GROUPED_NUMBER = re.compile(r"\b\d{1,3}(?:[.,`' ]\d{3})+\b")
+ROUND_RANGE = re.compile(r"(?<=00)\s+[-–]\s+(?=\d)")
+SCALE_UNIT = RULES.pattern(
+    r"""
+    (?<!\d)                 # start of the number (starts inside it can't match first)
     (\d+(?:[.,]\d+)?)       # first number
     (?:
         \s*(?:[-–—~]|до)\s* # optional range separator
         (\d+(?:[.,]\d+)?)   # second number
     )?
     \s*                     # optional spaces
-    тыс(?:ячи?|\.|\b)       # 'тыс', 'тысячи', 'тыс.' or boundary
+    (?P<scale>{scale_words}) # 'тыс', 'тысячи', 'тыс.' or boundary
+    """,
+    flags=re.IGNORECASE | re.VERBOSE,
+)
+CURRENCY = RULES.pattern(
+    r"""
+    (?<!\d)                           # start of the number (starts inside it can't match first)
+    (\d+)                             # integer number
+    \s*                               # optional space
+    (?P<word>{currency_words})\.?     # р, руб, рублей, rub + optional dot
+    (?=\W|$)                          # followed by non-word or end
+    """,
+    flags=re.IGNORECASE | re.VERBOSE,
+)
+# A number and everything the rules above can consume around it. No rule match crosses the bounds of
+# an island and lookarounds see at most one character past them, so the rules can run island by island.
+NUMERIC_ISLAND = RULES.pattern(
+    r"""
+    \d
+    (?:
+        [\d\s.,`'\-–—~{sign_chars}]   # digits, group and range separators, currency signs
+      | до                             # range word
+      | {island_words}                 # scale, shortcut and currency words
+      | {suffixes}(?!\w)               # 'к' scale suffix, not folded
+    )*
+    """,
+    flags=re.IGNORECASE | re.VERBOSE,
+)
+PLAIN_NUMBER = RULES.pattern(r"\d+[\s.,`'\-–—~{sign_chars}]*") # one number without words: no rule applies
+AMOUNT = RULES.pattern(
+    r"""
+    (?<!\d)
+    (?P<low>\d{1,3}(?:[.,`'\ ]\d{3})+(?!\d)|\d+(?:[.,]\d+)?)
+    (?:
+        \s*(?:[-–—~]|до)\s*
+        (?P<high>\d{1,3}(?:[.,`'\ ]\d{3})+(?!\d)|\d+(?:[.,]\d+)?)
+    )?
+    \s*(?P<scale>{amount_scales}|{suffixes}(?!\w))?
+    \s*(?P<currency>{signs}|{currency_words}\.?(?!\w))?
+    """,
+    flags=re.IGNORECASE | re.VERBOSE,
+)
+BOUND = re.compile(r"\b(от|до)\s+\Z", flags=re.IGNORECASE) # "от 100 тыс", "до 200 тыс"
+
+@dataclass(frozen=True, slots=True)
+class Salary:
     """
+    An amount with a scale or a currency, values as `fold_amounts` writes them:
+    "от 100 до 150 тыс руб" -> Salary(100000, 150000, "RUB", 1000, "100 до 150 тыс руб")
+    """
+    min: int | float | None
+    max: int | float | None
+    currency: str | None # "RUB", "USD", "EUR"
+    scale: int           # 1000 for "тыс", "тр", "к" (the `value` of the scale in the rule pack)
+    source: str          # the matched input text
+
+def fold_shortcuts(text: str) -> str:
+    def replacer(match: re.Match) -> str:
+        return f"{match[1]} {RULES.lookup(RULES.shortcuts, match['word'])[0]}"
+
+    return sub("fold.SHORTCUT", SHORTCUT, replacer, text)
+
+def fold_numbers(text: str) -> str:
+    text = sub(
+        "fold.GROUPED_NUMBER", GROUPED_NUMBER, lambda m: "".join(c for c in m.group(0) if c.isdigit()), text
+    )
+    text = sub("fold.ROUND_RANGE", ROUND_RANGE, "–", text)
+    return text
 
+def fold_scale_units(text: str) -> str:
     def replacer(match: re.Match) -> str:
-        num1 = float(match.group(1).replace(',', '.')) * 1000
+        scale = RULES.lookup(RULES.scales, match["scale"])
+        num1 = float(match.group(1).replace(',', '.')) * scale
         num2 = match.group(2)
         if num2:
-            num2 = float(num2.replace(',', '.')) * 1000
+            num2 = float(num2.replace(',', '.')) * scale
             return f"{int(num1)}–{int(num2)}"
         return str(int(num1))
 
-    return re.sub(pattern, replacer, text, flags=re.IGNORECASE | re.VERBOSE)
+    return sub("fold.SCALE_UNIT", SCALE_UNIT, replacer, text)
 
 def fold_currencies(text: str) -> str:
-    # capture integer then currency, unified approach and verbose regexes
-    text = re.sub(
-        r"""
-        (\d+)                             # integer number
-        \s*                               # optional space
-        (?:рублей|руб|р|rub)\.?           # р, руб, рублей, rub + optional dot
-        (?=\W|$)                          # followed by non-word or end
-        """,
-        r"\1 ₽",
-        text,
-        flags=re.IGNORECASE | re.VERBOSE,
-    )
-    return text
+    # capture integer then currency word, written as the currency's sign
+    def replacer(match: re.Match) -> str:
+        return f"{match[1]} {RULES.lookup(RULES.signs, match['word'])}"
+
+    return sub("fold.CURRENCY", CURRENCY, replacer, text)
+
+def fold_island(text: str) -> str:
+    return fold_currencies(fold_scale_units(fold_numbers(fold_shortcuts(text))))
+
+def amount_value(number: str, scale: int) -> int | float:
+    if GROUPED_NUMBER.fullmatch(number):
+        return int("".join(c for c in number if c.isdigit())) * scale
+    value = float(number.replace(",", ".")) * scale
+    return int(value) if scale > 1 or value.is_integer() else value
+
+def island_salaries(text: str, start: int, end: int) -> list[Salary]:
+    salaries = []
+    for match in AMOUNT.compile().finditer(text, start, end):
+        scale_word, currency = (match["scale"] or "").lower(), match["currency"]
+        if not scale_word and not currency:
+            continue
+        scale = RULES.lookup(RULES.scales, scale_word) if scale_word else 1
+        if currency:
+            currency = RULES.lookup(RULES.codes, currency)
+        elif scale_word.removesuffix(".") in RULES.shortcuts:
+            currency = RULES.lookup(RULES.shortcuts, scale_word)[1]
+        low = amount_value(match["low"], scale)
+        high = amount_value(match["high"], scale) if match["high"] else low
+        if not match["high"] and (bound := BOUND.search(text, max(match.start() - 8, 0), match.start())):
+            low, high = (low, None) if bound[1].lower() == "от" else (None, high)
+        if low is None and salaries and salaries[-1].max is None and salaries[-1].currency == currency:
+            # "от 3.000₽ до 35.000₽": the bounds of one range
+            salary = salaries.pop()
+            salaries.append(Salary(salary.min, high, currency, scale, text[opened:match.end()].rstrip()))
+            continue
+        opened = match.start()
+        salaries.append(Salary(low, high, currency, scale, match[0].rstrip()))
+    return salaries
+
+def scan_amounts(text: str, salaries: list[Salary] | None) -> str:
+    if "\0" in text:
+        if salaries is not None:
+            salaries += (s for island in NUMERIC_ISLAND.finditer(text) for s in island_salaries(text, *island.span()))
+        return fold_island(text)
+    spans, segments = [], []
+    # Compiled once per call: the patterns follow the installed rule pack
+    numeric_island, plain_number = NUMERIC_ISLAND.compile(), PLAIN_NUMBER.compile()
+    for island in numeric_island.finditer(text):
+        start, end = island.span()
+        if salaries is not None:
+            salaries += island_salaries(text, start, end)
+        if plain_number.fullmatch(text, start, end):
+            continue
+        # One character of context on each side for the lookarounds, the rules never change it
+        before, after = min(start, 1), min(len(text) - end, 1)
+        spans.append((start, end, before, after))
+        segments.append(text[start - before:end + after])
+    if not spans:
+        return text
+    # All islands folded at once, "\0" can't be matched nor seen by any rule
+    folded = fold_island("\0".join(segments)).split("\0")
+    parts = []
+    pos = 0
+    for (start, end, before, after), segment in zip(spans, folded):
+        parts.append(text[pos:start])
+        parts.append(segment[before:len(segment) - after])
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+def fold_amounts(text: str) -> str:
+    """
+    `fold_shortcuts`, `fold_numbers`, `fold_scale_units` and `fold_currencies` in one pass:
+    the numeric islands of the text are found once and only they are folded
+    """
+    return scan_amounts(text, None)
+
+def extract_salaries(text: str) -> tuple[str, list[Salary]]:
+    """
+    `fold_amounts(text)` and the salaries found on the way
+    """
+    salaries: list[Salary] = []
+    return scan_amounts(text, salaries), salaries
@@ -0,0 +1,26 @@
+import re
+from typing import Any
+
+class LazyPattern:
+    """
+    `re.compile(pattern, flags)` deferred to the first use, so importing a module with big
+    verbose patterns is cheap. `pattern` and `flags` are available without compiling.
+    """
+    __slots__ = ("pattern", "flags", "compiled")
+
+    def __init__(self, pattern: str, flags: int = 0):
+        self.pattern = pattern
+        self.flags = flags
+        self.compiled: re.Pattern | None = None
+
+    def compile(self) -> re.Pattern:
+        if self.compiled is None:
+            self.compiled = re.compile(self.pattern, self.flags)
+        return self.compiled
+
+    def __getattr__(self, name: str) -> Any:
+        # `search`, `sub`, `finditer`, etc. of the compiled pattern
+        return getattr(self.compile(), name)
+
+    def __repr__(self) -> str:
+        return f"LazyPattern({self.pattern!r}, {self.flags})"
@@ -0,0 +1,97 @@
+import re
+import unicodedata
+from functools import cache
+from typing import Iterable
+
+# Blocks the tables are built for on first use: Latin with diacritics, combining marks, Greek, Cyrillic,
+# Latin and Greek Extended, punctuation, super- and subscripts, letterlike and number forms, enclosed
+# alphanumerics, symbols and dingbats, ligatures, variation selectors, fullwidth forms, emoji.
+# Other characters go through `unicodedata` once, when first seen.
+COVERED = [(0x0000, 0x052F), (0x1E00, 0x1FFF), (0x2000, 0x2BFF), (0xFB00, 0xFFEF), (0x1F000, 0x1FAFF)]
+
+def fold_char(char: str, form: str) -> str:
+    """
+    `char` decomposed by `form` ("NFD" or "NFKD"), without combining marks, recomposed:
+    "é" -> "e", "й" -> "и", "ё" -> "е", and with "NFKD" also "ﬁ" -> "fi", "Ａ" -> "A", "²" -> "2"
+    """
+    decomposed = unicodedata.normalize(form, char)
+    return unicodedata.normalize("NFC", "".join(c for c in decomposed if not unicodedata.combining(c)))
+
+def char_class(ranges: Iterable[tuple[int, int]]) -> str:
+    return "".join(f"\\U{start:08x}" if start == end else f"\\U{start:08x}-\\U{end:08x}" for start, end in ranges)
+
+def code_ranges(codes: Iterable[int]) -> list[tuple[int, int]]:
+    ranges: list[tuple[int, int]] = []
+    for code in sorted(codes):
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1] = (ranges[-1][0], code)
+        else:
+            ranges.append((code, code))
+    return ranges
+
+class LetterTable(dict):
+    """
+    `str.translate` table of `fold_char` for one form: the COVERED characters it changes, plus other
+    characters as they are seen. `pattern` finds runs of characters that the table changes or doesn't know yet,
+    only they are translated: most text is skipped at C speed.
+    """
+    def __init__(self, form: str):
+        super().__init__()
+        self.form = form
+        for start, end in COVERED:
+            for code in range(start, end + 1):
+                char = chr(code)
+                if (folded := fold_char(char, form)) != char:
+                    self[code] = folded
+        outside, pos = [], 0
+        for start, end in [*COVERED, (0x110000, 0x110000)]:
+            if start > pos:
+                outside.append((pos, start - 1))
+            pos = end + 1
+        self.pattern = re.compile(f"[{char_class(code_ranges(self))}{char_class(outside)}]+")
+
+    def __missing__(self, code: int) -> str | int:
+        char = chr(code)
+        folded = fold_char(char, self.form)
+        self[code] = value = code if folded == char else folded
+        return value
+
+    def replace(self, match: re.Match) -> str:
+        return match[0].translate(self)
+
+    def fold(self, text: str) -> str:
+        return self.pattern.sub(self.replace, text)
+
+    def fold_many(self, texts: Iterable[str]) -> list[str]:
+        sub, replace = self.pattern.sub, self.replace
+        return [sub(replace, text) for text in texts]
+
+@cache
+def letter_table(form: str) -> LetterTable:
+    return LetterTable(form)
+
+def strip_diacritics(text: str) -> str:
+    """
+    Drop combining marks, what `unicodedata.normalize("NFD")` and a filter do, from a precomputed table:
+    "Café Zürich" -> "Cafe Zurich", "ёлка" -> "елка", "йогурт" -> "иогурт", stress marks are removed
+    """
+    return letter_table("NFD").fold(text)
+
+def fold_letters(text: str) -> str:
+    """
+    `strip_diacritics` plus compatibility forms (NFKD): "ﬁ" -> "fi", "Ｈｅｌｌｏ" -> "Hello", "²" -> "2",
+    "…" -> "...", "№" -> "No", NBSP -> " "
+    """
+    return letter_table("NFKD").fold(text)
+
+def strip_diacritics_many(texts: Iterable[str]) -> list[str]:
+    """
+    `strip_diacritics` of each text, the table and its pattern looked up once
+    """
+    return letter_table("NFD").fold_many(texts)
+
+def fold_letters_many(texts: Iterable[str]) -> list[str]:
+    """
+    `fold_letters` of each text, the table and its pattern looked up once
+    """
+    return letter_table("NFKD").fold_many(texts)
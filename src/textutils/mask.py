@@ -1,28 +1,37 @@
 import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+from .lazy import LazyPattern
+from .rules import RULES
+from .trace import count
 
-URL = re.compile(
+URL = RULES.pattern(
     r"""
     (?:                                   # Entire URL
       https?://[^\s'">]+(?<!\))           # Option 1: http(s):// ... but not ending with ')'
     | www\.[^\s'">]+(?<!\))               # Option 2: www....  but not ending with ')'
     |                                     # Option 3:
+      (?<![a-z0-9-])(?<![a-z0-9-]\.)      #   Start of a domain (starts inside it can't match first)
       (?:[a-z0-9-]+\.)+                   #   Subdomain(s)
-      (?:com|org|net|io|me|co|dev|ai|be)  #   Whitelist TLDs
-      (?:/[^\s'">]*)?(?<!\))              #   Optional path  
+      {tlds}                              #   Whitelist TLDs (rule pack)
+      (?:/[^\s'">]*)?(?<!\))              #   Optional path
     )
     """,
     flags=re.VERBOSE | re.IGNORECASE,
 )
-EMAIL = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", flags=re.IGNORECASE)
-MENTION = re.compile(r"@[A-Za-z0-9_]+")
-PHONE = re.compile(
+EMAIL = LazyPattern(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", flags=re.IGNORECASE)
+# Same as EMAIL but only starts at the beginning of a local part, see `email_spans`
+EMAIL_START = LazyPattern(r"(?<![a-zA-Z0-9._%+-])" + EMAIL.pattern, flags=re.IGNORECASE)
+MENTION = LazyPattern(r"@[A-Za-z0-9_]+")
+PHONE = LazyPattern(
     r"""
     (?<!\w) # Negative lookbehind to prevent partial matches
     (?:
       # Option 1: Must start with a '+'
-      \+\d{1,3}(?:[\s-]?\(?\d{2,4}\)?[\s-]?)*\d{2,4}(?:[\s-]?\d{2,4}){1,3}
+      # \+\d{1,3}(?:[\s-]?\(?\d{2,4}\)?[\s-]?)*\d{2,4}(?:[\s-]?\d{2,4}){1,3}
+      # (backtracks exponentially on long digit runs, matched by `match_international` instead)
 
-    | # Option 2: Must contain an opening parenthesis '('
+      # Option 2: Must contain an opening parenthesis '('
       (?:\d{1,3}[\s-]?)?\(\d{2,4}\)[\s-]?\d{2,4}(?:[\s-]?\d{2,4}){1,3}
 
     | # Option 3: Russian mobile starting with 8 followed by 10 digits
@@ -32,6 +41,262 @@ PHONE = re.compile(
     """,
     flags=re.VERBOSE | re.IGNORECASE,
 )
+TAX_ID = LazyPattern(r"(?<=ИНН: )(\d+)", flags=re.IGNORECASE)
+
+# kind -> (placeholder, trace rule)
+KINDS: dict[str, tuple[str, str]] = {
+    "email": ("[EMAIL]", "mask.EMAIL"),
+    "url": ("[URL]", "mask.URL"),
+    "mention": ("[MENTION]", "mask.MENTION"),
+    "phone": ("[PHONE]", "mask.PHONE"),
+    "id": ("[ID]", "mask.TAX_ID"),
+}
+# What every match of the passes contains, in the text they start from: '@' (email, mention),
+# '+' and '(' (phone options 1 and 2), "://" and "www." (url), a dot before a TLD (domain), "ИНН: "
+# and an '8' followed by ten digits (phone option 3). Placeholders never make one.
+CONTACT_ANCHOR = RULES.pattern(
+    r"""
+      [@+(]
+    | :(?://|(?<=(?i:инн):)\ )
+    | \.(?:(?<=(?i:www)\.)|(?=(?i:{tlds})))
+    | 8(?:[\s-]?\d){10}
+    """,
+    flags=re.VERBOSE,
+)
+# The rest of a region from inside a word: words joined by whitespace a match can span (see `joins`)
+REGION_TAIL = LazyPattern(r"\S*+(?:(?:(?<=[\d)\-])\s{1,2}(?=[\d(\-])|(?<=:)\ (?=\S))\S++)*+")
+
+@dataclass(frozen=True, slots=True)
+class Contact:
+    kind: str # "email", "url", "mention", "phone" or "id"
+    start: int
+    end: int
+    value: str
+
+def is_word_at(text: str, i: int) -> bool:
+    return i < len(text) and (text[i].isalnum() or text[i] == "_") # `\w`
+
+def match_international(text: str, start: int) -> int | None:
+    """
+    End of PHONE option 1 matched at `start` (a '+' not preceded by `\\w`), `None` if it doesn't match:
+    \\+\\d{1,3}(?:[\\s-]?\\(?\\d{2,4}\\)?[\\s-]?)*\\d{2,4}(?:[\\s-]?\\d{2,4}){1,3}(?!\\w)
+    Returns exactly what the backtracking regex returns: for each position of the phone-like run
+    the first successful continuation is computed once, right to left, so the time is linear.
+    """
+    n = len(text)
+    end = start + 1
+    while end < n and (text[end] in "-()" or text[end].isdecimal() or text[end].isspace()):
+        end += 1
+    digits = [0] * (end - start + 1) # length of the digit run at each offset
+    for i in range(end - 1, start, -1):
+        if text[i].isdecimal():
+            digits[i - start] = digits[i - start + 1] + 1
+
+    def digit_ends(i: int, lo: int, hi: int) -> range: # greedy `\d{lo,hi}`
+        return range(i + min(digits[i - start], hi), i + lo - 1, -1)
+
+    def separator(i: int) -> tuple[int, ...]: # greedy `[\s-]?`
+        return (i + 1, i) if i < end and (text[i] == "-" or text[i].isspace()) else (i,)
+
+    def literal(i: int, char: str) -> tuple[int, ...]: # greedy `\(?` / `\)?`
+        return (i + 1, i) if i < end and text[i] == char else (i,)
+
+    tails: dict[tuple[int, int], int | None] = {}
+
+    def tail(i: int, count: int) -> int | None: # (?:[\s-]?\d{2,4}){count,3}(?!\w)
+        if (i, count) in tails:
+            return tails[i, count]
+        result = None
+        if count < 3:
+            for j in separator(i):
+                for k in digit_ends(j, 2, 4):
+                    if (result := tail(k, count + 1)) is not None:
+                        break
+                if result is not None:
+                    break
+        if result is None and count >= 1 and not is_word_at(text, i):
+            result = i
+        tails[i, count] = result
+        return result
+
+    def group(i: int) -> int | None: # (?:[\s-]?\(?\d{2,4}\)?[\s-]?)*\d{2,4}(?:[\s-]?\d{2,4}){1,3}(?!\w)
+        for j in separator(i):
+            for k in literal(j, "("):
+                for l in digit_ends(k, 2, 4):
+                    for m in literal(l, ")"):
+                        for o in separator(m):
+                            if (result := groups[o - start]) is not None: # o > i, already known
+                                return result
+        for k in digit_ends(i, 2, 4):
+            if (result := tail(k, 0)) is not None:
+                return result
+        return None
+
+    groups: list[int | None] = [None] * (end - start + 1)
+    for i in range(end, start, -1):
+        groups[i - start] = group(i)
+    for i in digit_ends(start + 1, 1, 3):
+        if groups[i - start] is not None:
+            return groups[i - start]
+    return None
+
+def email_spans(text: str) -> Iterator[tuple[int, int]]:
+    """
+    Spans of EMAIL matches, as `EMAIL.finditer` but in linear time: a start inside a local part
+    can only match if the start of that local part does, so only the position where the previous match
+    ended is tried with EMAIL, the rest of the text is searched with EMAIL_START
+    """
+    if "@" not in text:
+        return
+    email, email_start = EMAIL.compile(), EMAIL_START.compile()
+    pos = 0
+    while pos < len(text):
+        m = email.match(text, pos) or email_start.search(text, pos)
+        if m is None:
+            return
+        yield m.span()
+        pos = m.end()
+
+def url_spans(text: str) -> list[tuple[int, int]]:
+    return [m.span() for m in URL.finditer(text)] if "." in text or ":" in text else []
+
+def mention_spans(text: str) -> list[tuple[int, int]]:
+    return [m.span() for m in MENTION.finditer(text)] if "@" in text else []
+
+def phone_spans(text: str) -> Iterator[tuple[int, int]]:
+    """
+    Spans of PHONE matches (all three options) in the order `re.finditer` would produce them
+    """
+    if "+" not in text and "(" not in text and "8" not in text:
+        return
+    pos = 0
+    local = PHONE.search(text)
+    while True:
+        if local is not None and local.start() < pos:
+            local = PHONE.search(text, pos)
+        limit = local.start() if local is not None else len(text)
+        span = None
+        plus = text.find("+", pos, limit)
+        while plus != -1:
+            if not (plus > 0 and is_word_at(text, plus - 1)):
+                if (end := match_international(text, plus)) is not None:
+                    span = (plus, end)
+                    break
+            plus = text.find("+", plus + 1, limit)
+        if span is None:
+            if local is None:
+                return
+            span = local.span()
+        yield span
+        pos = span[1]
+
+def tax_id_spans(text: str) -> list[tuple[int, int]]:
+    return [m.span() for m in TAX_ID.finditer(text)] if ":" in text else []
+
+# The passes in precedence order, each one runs on the output of the previous ones
+PASSES: dict[str, Callable[[str], Iterable[tuple[int, int]]]] = {
+    "email": email_spans,
+    "url": url_spans,
+    "mention": mention_spans,
+    "phone": phone_spans,
+    "id": tax_id_spans,
+}
+
+def mask_passes(text: str) -> tuple[str, list[tuple[str, int, int]]]:
+    """
+    `text` through the passes, and the `(kind, start, end)` in `text` of each placeholder of the result.
+    A match that covers placeholders of earlier passes ("http://x.io/[EMAIL]") replaces them.
+    """
+    marks: list[tuple[str, int, int]] = []
+    # Where a match starting / ending at each position of the current text starts / ends in `text`
+    starts: list[int] | None = None
+    ends: list[int] | None = None
+    for kind, spans in PASSES.items():
+        found = list(spans(text))
+        if not found:
+            continue
+        placeholder, rule = KINDS[kind]
+        count(rule, len(found))
+        if starts is None or ends is None:
+            starts = ends = list(range(len(text) + 1))
+        parts: list[str] = []
+        new_starts: list[int] = []
+        new_ends: list[int] = []
+        new_marks: list[tuple[str, int, int]] = []
+        pos = i = 0
+        for s, e in found:
+            start, end = starts[s], ends[e]
+            while i < len(marks) and marks[i][2] <= start:
+                new_marks.append(marks[i])
+                i += 1
+            while i < len(marks) and marks[i][1] < end: # covered by the match
+                i += 1
+            new_marks.append((kind, start, end))
+            parts += [text[pos:s], placeholder]
+            new_starts += starts[pos:s] + [start] * len(placeholder)
+            new_ends += ends[pos:s] + [ends[s]] + [end] * (len(placeholder) - 1)
+            pos = e
+        parts.append(text[pos:])
+        text, starts, ends = "".join(parts), new_starts + starts[pos:], new_ends + ends[pos:]
+        marks = new_marks + marks[i:]
+    return text, marks
+
+def joins(text: str, left: int, right: int) -> bool:
+    """
+    Whether a match can span the whitespace `text[left:right]` between two words, as REGION_TAIL:
+    a phone's separators ("+7 (920) 123 45 67") or the space of "ИНН: 123"
+    """
+    before, after = text[left - 1], text[right]
+    if before == ":":
+        return text[left:right] == " "
+    return (
+        right - left <= 2
+        and (before.isdecimal() or before in ")-")
+        and (after.isdecimal() or after in "(-")
+    )
+
+def contact_regions(text: str) -> Iterator[tuple[int, int]]:
+    """
+    Spans of the text the passes can change: the words around each CONTACT_ANCHOR, with their neighbours
+    as long as a match can span the whitespace between them. No match crosses the bounds of a region and
+    lookarounds see whitespace past them, so the passes give the same result region by region.
+    On mostly-prose texts the regions are a few words out of thousands.
+    """
+    region_tail = REGION_TAIL.compile()
+    start = end = -1
+    for anchor in CONTACT_ANCHOR.finditer(text):
+        if anchor.end() <= end:
+            continue
+        if anchor.start() >= end:
+            if end >= 0:
+                yield start, end
+            start = anchor.start()
+            while True:
+                while start > 0 and not text[start - 1].isspace():
+                    start -= 1
+                gap = start
+                while gap > 0 and text[gap - 1].isspace() and start - gap < 3:
+                    gap -= 1
+                if gap == 0 or gap == start or text[gap - 1].isspace() or not joins(text, gap, start):
+                    break
+                start = gap
+        end = region_tail.match(text, anchor.end()).end()
+    if end >= 0:
+        yield start, end
+
+def scan_contacts(text: str) -> Iterator[tuple[str, int, int]]:
+    """
+    `(kind, start, end)` of every placeholder `mask_contacts` writes, in order
+    """
+    for start, end in contact_regions(text):
+        for kind, s, e in mask_passes(text[start:end])[1]:
+            yield kind, start + s, start + e
+
+def extract_contacts(text: str) -> list[Contact]:
+    """
+    Contacts found in `text` with their kind, span and value, same matches `mask_contacts` replaces
+    """
+    return [Contact(kind, start, end, text[start:end]) for kind, start, end in scan_contacts(text)]
 
 def mask_contacts(text: str) -> str:
     """
@@ -40,12 +305,19 @@ def mask_contacts(text: str) -> str:
     - Email -> [EMAIL]
     - @mention -> [MENTION]
     - Phone number -> [PHONE]
+    The passes (EMAIL, URL, MENTION, PHONE, then TAX_ID, each on the output of the previous ones)
+    only run on the regions of the text around a CONTACT_ANCHOR.
     """
     if not text:
         return ""
-    text = EMAIL.sub("[EMAIL]", text)
-    text = URL.sub("[URL]", text)
-    text = MENTION.sub("[MENTION]", text)
-    text = PHONE.sub("[PHONE]", text)
-    text = re.sub(r"(?<=ИНН: )(\d+)", "[ID]", text, flags=re.IGNORECASE)
-    return text
+    parts: list[str] = []
+    pos = 0
+    for start, end in contact_regions(text):
+        masked, marks = mask_passes(text[start:end])
+        if marks:
+            parts += [text[pos:start], masked]
+            pos = end
+    if not parts:
+        return text
+    parts.append(text[pos:])
+    return "".join(parts)
@@ -0,0 +1,213 @@
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable
+from .bucket import bucket_numbers
+from .cleanup import clean_unicode, denoise, normalize_whitespace
+from .fold import Salary, extract_salaries, fold_amounts, fold_currencies, fold_numbers, fold_scale_units, fold_shortcuts
+from .letters import fold_letters, strip_diacritics
+from .mask import mask_contacts
+from .rules import RULES
+from .trace import TRACE, Trace, count, sub
+
+# Cheap prechecks: a stage is skipped when its trigger can't be found in the text
+DIGIT = re.compile(r"\d")
+CONTACT_HINT = re.compile(r"[@.\d]|://")
+
+# Currency words, signs and units from the rule pack: UNIT_R is for currency words ('р'), UNIT_M2 for units ('м2')
+UNIT_R = RULES.pattern(r"(?<=\d){spaced_currencies}\b")
+UNIT_CURRENCY = RULES.pattern(r"(?<=\d)({signs})")
+UNIT_M2 = RULES.pattern(r"(?<=\d){units}\b")
+FROM_TO = re.compile(r"\bот\s+(\d+)\d\s+до\s+(\d+)", flags=re.IGNORECASE)
+# The four rules above in one pass: their matches can't overlap, and the only match one creates for
+# another is "5м2р" -> "5м2 р" -> "5 м2 р", written out in UNIT_M2. Only tried where UNITS_ANCHOR allows.
+UNITS_AND_RANGES = RULES.pattern(
+    r"""
+      (?P<UNIT_R>(?<=\d){spaced_currencies}\b)
+    | (?P<UNIT_CURRENCY>{signs}(?<=\d.))
+    | (?P<UNIT_M2>(?<=\d){units}(?:\b|(?={spaced_currencies}\b)))
+    | (?P<FROM_TO>[оО\u1c82](?<!\w.)(?i:т)\s+(\d+)\d\s+(?i:до)\s+(\d+))
+    """,
+    flags=re.VERBOSE,
+)
+# Where UNITS_AND_RANGES can match, found from digits rather than from every 'р', 'м' and 'о' of the text:
+# a digit followed by a unit (the unit starts right after it), or the first digit of a number after
+# whitespace ("от" may end right before the whitespace)
+UNITS_ANCHOR = RULES.pattern(r"\d(?:(?={signs}|{spaced_currencies}|{units})|(?<=\s\d))")
+
+def space_units(text: str) -> str:
+    """
+    Unify secondary whitespace cases: "100р" -> "100 р", "100₽" -> "100 ₽", "45м2" -> "45 м2"
+    """
+    text = sub("pipeline.UNIT_R", UNIT_R, r" \g<0>", text)
+    text = sub("pipeline.UNIT_CURRENCY", UNIT_CURRENCY, r" \1", text)
+    text = sub("pipeline.UNIT_M2", UNIT_M2, r" \g<0>", text)
+    return text
+
+def collapse_ranges(text: str) -> str:
+    """
+    Collapse common "от NUM до NUM" cases
+    """
+    return sub("pipeline.FROM_TO", FROM_TO, r"\1–\2", text)
+
+def space_units_and_ranges(text: str) -> str:
+    """
+    `space_units` and `collapse_ranges` in one pass
+    """
+    def replacer(match: re.Match) -> str:
+        count(f"pipeline.{match.lastgroup}", 1)
+        if match.lastgroup == "FROM_TO":
+            return f"{match[5]}–{match[6]}"
+        return f" {match[0]}"
+
+    units_and_ranges = UNITS_AND_RANGES.compile()
+    parts = []
+    pos = 0
+    for anchor in UNITS_ANCHOR.finditer(text):
+        digit = anchor.start()
+        starts = [digit + 1]
+        if digit and text[digit - 1].isspace(): # `\s`
+            k = digit - 1
+            while k and text[k - 1].isspace():
+                k -= 1
+            starts.insert(0, k - 2) # "от" before the whitespace
+        for start in starts:
+            if start < pos or (match := units_and_ranges.match(text, start)) is None:
+                continue
+            parts.append(text[pos:start])
+            parts.append(replacer(match))
+            pos = match.end()
+    if not parts:
+        return text
+    parts.append(text[pos:])
+    return "".join(parts)
+
+class BudgetExceeded(TimeoutError):
+    pass
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    func: Callable[[str], str]
+    trigger: re.Pattern | None = None # the stage can't fire if `trigger` is not found
+
+    def __call__(self, text: str) -> str:
+        if self.trigger is not None and not self.trigger.search(text):
+            return text
+        return self.func(text)
+
+    def traced(self, text: str, trace: Trace) -> str:
+        if self.trigger is not None and not self.trigger.search(text):
+            trace.stage(self.name).skipped += 1
+            return text
+        return trace.run(self.name, self.func, text)
+
+class Pipeline:
+    """
+    A reusable chain of stages. Stages are built (and their patterns compiled) once,
+    each call only runs the stages whose triggers are present in the current text.
+    """
+    def __init__(self, stages: Iterable[Stage]):
+        self.stages: tuple[Stage, ...] = tuple(stages)
+
+    def __call__(self, text: str, budget: float | None = None) -> str:
+        """
+        `budget`: seconds allowed for the call, checked after each stage, `BudgetExceeded` is raised when spent
+        """
+        trace = TRACE.get()
+        if trace is None and budget is None:
+            for stage in self.stages:
+                text = stage(text)
+            return text
+        deadline = None if budget is None else time.perf_counter() + budget
+        for stage in self.stages:
+            text = stage(text) if trace is None else stage.traced(text, trace)
+            if deadline is not None and time.perf_counter() > deadline:
+                raise BudgetExceeded(f"{self!r} exceeded its {budget}s budget at stage {stage.name!r}")
+        return text
+
+    def __repr__(self) -> str:
+        return f"Pipeline({', '.join(stage.name for stage in self.stages)})"
+
+PREPROCESS = Pipeline([
+    Stage("denoise", denoise),
+    Stage("space_units_and_ranges", space_units_and_ranges, DIGIT),
+    Stage("mask_contacts", mask_contacts, CONTACT_HINT),
+    Stage("fold_amounts", fold_amounts, DIGIT),
+    Stage("normalize_whitespace", normalize_whitespace),
+])
+
+def preprocess(text: str, budget: float | None = None) -> str:
+    return PREPROCESS(text, budget)
+
+def preprocess_salaries(text: str) -> tuple[str, list[Salary]]:
+    """
+    `preprocess(text)` and the salaries its `fold_amounts` stage found
+    """
+    salaries: list[Salary] = []
+    for stage in PREPROCESS.stages:
+        if stage.func is fold_amounts:
+            if stage.trigger.search(text):
+                text, salaries = extract_salaries(text)
+        else:
+            text = stage(text)
+    return text, salaries
+
+# Named stages for ad-hoc chains, e.g. `Pipeline(STAGES[name] for name in "denoise,mask_contacts".split(","))`
+STAGES: dict[str, Stage] = {
+    **{stage.name: stage for stage in PREPROCESS.stages},
+    # The single-rule stages `preprocess` used before the fused ones, same output
+    "space_units": Stage("space_units", space_units, DIGIT),
+    "collapse_ranges": Stage("collapse_ranges", collapse_ranges, DIGIT),
+    "fold_shortcuts": Stage("fold_shortcuts", fold_shortcuts, DIGIT),
+    "fold_numbers": Stage("fold_numbers", fold_numbers, DIGIT),
+    "fold_scale_units": Stage("fold_scale_units", fold_scale_units, DIGIT),
+    "fold_currencies": Stage("fold_currencies", fold_currencies, DIGIT),
+    "clean_unicode": Stage("clean_unicode", clean_unicode),
+    "bucket_numbers": Stage("bucket_numbers", bucket_numbers, DIGIT),
+    "strip_diacritics": Stage("strip_diacritics", strip_diacritics),
+    "fold_letters": Stage("fold_letters", fold_letters),
+    "preprocess": Stage("preprocess", preprocess),
+}
+
+@dataclass
+class ViewNode:
+    children: dict[Stage, "ViewNode"]
+    views: list[str] # views whose chain ends at this node
+
+class Views:
+    """
+    Several named chains over the same text, e.g. an LLM view, a masked and bucketed dedupe view
+    and an unmasked search view. The chains are merged into a tree, so the stages of a common prefix
+    run once per text: `Views(...)(text)` -> `{"llm": ..., "dedupe": ..., "search": ...}`
+    """
+    def __init__(self, views: dict[str, Pipeline | Iterable[Stage]]):
+        self.views = {name: chain if isinstance(chain, Pipeline) else Pipeline(chain) for name, chain in views.items()}
+        self.root = ViewNode({}, [])
+        for name, chain in self.views.items():
+            node = self.root
+            for stage in chain.stages:
+                node = node.children.setdefault(stage, ViewNode({}, []))
+            node.views.append(name)
+
+    def __call__(self, text: str) -> dict[str, str]:
+        trace = TRACE.get()
+        results: dict[str, str] = {}
+        pending = [(self.root, text)]
+        while pending:
+            node, text = pending.pop()
+            for name in node.views:
+                results[name] = text
+            for stage, child in node.children.items():
+                pending.append((child, stage(text) if trace is None else stage.traced(text, trace)))
+        return {name: results[name] for name in self.views}
+
+    def __repr__(self) -> str:
+        return f"Views({', '.join(f'{name}={chain!r}' for name, chain in self.views.items())})"
+
+# Contact masking and number bucketing destroy information, so only the views that need them apply them
+VIEWS = Views({
+    "llm": PREPROCESS,
+    "dedupe": [*PREPROCESS.stages, STAGES["bucket_numbers"]],
+    "search": [stage for stage in PREPROCESS.stages if stage.name != "mask_contacts"],
+})
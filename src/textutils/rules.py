@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+from .lazy import LazyPattern
+
+# The vocabulary of the fold, mask and unit spacing rules, as a rule pack file (TOML or JSON) spells it.
+# Word lists become prefix-trie alternations, and all the words of a kind share one pattern.
+DEFAULT_PACK: dict[str, Any] = {
+    # "100 руб" -> "100 ₽". The sign alone is enough: "100$", "100 €"
+    "currencies": {
+        "RUB": {"sign": "₽", "words": ["рублей", "руб", "р", "rub"]},
+        "USD": {"sign": "$"},
+        "EUR": {"sign": "€"},
+    },
+    # "100 тыс" -> "100000". A word ending with "." is an abbreviation: with the dot or at the end of a word.
+    # Suffixes ("200к") only count for `extract_salaries`, the text keeps them.
+    "scales": {
+        "thousand": {"value": 1000, "words": ["тысячи", "тысяч", "тыс."], "suffixes": ["к", "k"]},
+    },
+    # A scale and a currency in one word: "100тр" -> "100 тыс. ₽"
+    "shortcuts": {
+        "тр": {"scale": "thousand", "currency": "RUB"},
+    },
+    # Spaced from the number they are glued to: "100р" -> "100 р", "45м2" -> "45 м2", "5м2р" -> "5 м2 р"
+    "spaced": {"currencies": ["р"], "units": ["м2"]},
+    # Domains without "http(s)://" or "www." are masked only with these TLDs
+    "tlds": ["com", "org", "net", "io", "me", "co", "dev", "ai", "be"],
+}
+# Rule pack files applied over DEFAULT_PACK on import, separated by `os.pathsep`: how processes
+# that textutils doesn't start get the packs (its pools hand the installed pack to their workers, see `install`)
+ENV = "TEXTUTILS_RULES"
+# Regex placeholders of `RulePattern` templates ("\d{1,3}" is not one)
+PLACEHOLDER = re.compile(r"\{([A-Za-z_]\w*)\}")
+
+def load_pack(path: str | os.PathLike) -> dict[str, Any]:
+    """
+    Rule pack from a `.toml` or `.json` file
+    """
+    with open(path, "rb") as f:
+        if os.fspath(path).endswith(".toml"):
+            import tomllib # ~30 ms to import, only paid by TOML packs
+            return tomllib.load(f)
+        return json.load(f)
+
+def merge_packs(*packs: dict[str, Any]) -> dict[str, Any]:
+    """
+    Later packs extend earlier ones: tables are merged, lists extended, other values replaced.
+    `merge_packs(DEFAULT_PACK, {"currencies": {"KZT": {"sign": "₸", "words": ["тенге", "тг"]}}})`
+    """
+    merged: dict[str, Any] = {}
+    for pack in packs:
+        for key, value in pack.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = merge_packs(merged[key], value)
+            elif isinstance(value, list) and isinstance(merged.get(key), list):
+                merged[key] = list(dict.fromkeys([*merged[key], *value]))
+            else:
+                merged[key] = value
+    return merged
+
+def pack_digest(pack: dict[str, Any]) -> str:
+    data = json.dumps(pack, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def alternation(words: Iterable[str], abbreviation: Iterable[str] = ("",)) -> str:
+    r"""
+    Prefix-trie regex for any of `words`, longer words first as in a hand-written alternation:
+    ["рублей", "руб", "р"] -> "р(?:уб(?:лей)?)?". A word ending with "." is an abbreviation, it ends
+    with one of the `abbreviation` alternatives ("" for nothing): ["тыс."], [r"\.", r"\b"] -> r"тыс(?:\.|\b)".
+    No words: a pattern that never matches.
+    """
+    trie: dict[str, Any] = {}
+    for word in words:
+        abbreviated = len(word) > 1 and word.endswith(".")
+        node = trie
+        for char in word[:-1] if abbreviated else word:
+            node = node.setdefault(char, {})
+        ends = node.setdefault("", [])
+        ends.extend(end for end in (abbreviation if abbreviated else [""]) if end not in ends)
+    trie.pop("", None)
+    return render(trie)[0] if trie else "(?!)"
+
+def is_char(branch: str) -> bool:
+    r"""
+    One character, maybe escaped: "р", r"\." (not r"\b", a backspace in a class)
+    """
+    return len(branch) == 1 or (len(branch) == 2 and branch[0] == "\\" and not branch[1].isalnum())
+
+def render(node: dict[str, Any]) -> tuple[str, bool]:
+    """
+    Regex for the words below a trie node, and whether it is a single atom (can take a quantifier):
+    the longer words first, then how the words ending at the node end, nothing last
+    """
+    ends = node.get("", [])
+    branches = [re.escape(char) + render(child)[0] for char, child in sorted(node.items()) if char]
+    branches += [end for end in ends if end]
+    if len(branches) > 1:
+        single = all(map(is_char, branches))
+        pattern, atom = f"[{''.join(branches)}]" if single else f"(?:{'|'.join(branches)})", True
+    elif branches:
+        pattern, atom = branches[0], is_char(branches[0])
+    else:
+        return "", True
+    if "" in ends:
+        return (pattern if atom else f"(?:{pattern})") + "?", True
+    return pattern, atom
+
+def char_class(chars: Iterable[str]) -> str:
+    """
+    `[...]` body of single characters, "" for none
+    """
+    return "".join(dict.fromkeys(re.escape(char) for char in chars))
+
+@dataclass(frozen=True)
+class CompiledPack:
+    """
+    A rule pack compiled: regex fragments for the `RulePattern` templates and the tables the replacers read.
+    Words are lowercased, matches are looked up with `Rules.lookup`.
+    """
+    digest: str
+    fragments: dict[str, str]
+    signs: dict[str, str]                      # currency word -> sign
+    codes: dict[str, str]                      # currency sign or word -> code
+    scales: dict[str, int | float]             # scale word, suffix or shortcut -> value
+    shortcuts: dict[str, tuple[str, str]]      # shortcut -> (expansion, currency code)
+
+def words_of(table: dict[str, Any], key: str) -> list[str]:
+    return [word.lower() for entry in table.values() for word in entry.get(key, [])]
+
+def compile_pack(pack: dict[str, Any]) -> CompiledPack:
+    unknown = set(pack) - set(DEFAULT_PACK)
+    if unknown:
+        raise ValueError(f"unknown rule pack section(s) {', '.join(sorted(unknown))}, expected some of: {', '.join(DEFAULT_PACK)}")
+    currencies, scales, shortcuts = pack.get("currencies", {}), pack.get("scales", {}), pack.get("shortcuts", {})
+    spaced = pack.get("spaced", {})
+    signs, codes, values, expansions = {}, {}, {}, {}
+    for code, currency in currencies.items():
+        sign = currency.get("sign", "")
+        if len(sign) > 1:
+            raise ValueError(f"currency {code}: the sign must be one character, got {sign!r}")
+        if sign:
+            codes[sign] = code
+        for word in currency.get("words", []):
+            signs[word.lower()] = sign or code
+            codes[word.lower()] = code
+    for name, scale in scales.items():
+        if "value" not in scale:
+            raise ValueError(f"scale {name}: missing value")
+        for word in [*scale.get("words", []), *scale.get("suffixes", [])]:
+            values[word.lower().removesuffix(".")] = scale["value"]
+    for word, shortcut in shortcuts.items():
+        scale, currency = scales.get(shortcut.get("scale")), currencies.get(shortcut.get("currency"))
+        if scale is None or currency is None:
+            raise ValueError(f"shortcut {word!r}: unknown scale or currency {shortcut}")
+        # "тр" -> "тыс. ₽": the scale's abbreviation (or first word, or suffix) and the currency's sign (or code)
+        words = [*scale.get("words", []), *scale.get("suffixes", [])]
+        if not words:
+            raise ValueError(f"shortcut {word!r}: scale {shortcut['scale']} has no words nor suffixes")
+        short = next((w for w in words if w.endswith(".")), words[0])
+        expansions[word.lower()] = (f"{short} {currency.get('sign') or shortcut['currency']}", shortcut["currency"])
+        values[word.lower()] = scale["value"]
+
+    scale_words, shortcut_words = words_of(scales, "words"), [word.lower() for word in shortcuts]
+    currency_words = words_of(currencies, "words")
+    sign_chars = char_class(currency["sign"] for currency in currencies.values() if currency.get("sign"))
+    island_words = [word.removesuffix(".") for word in [*scale_words, *shortcut_words, *currency_words]]
+    fragments = {
+        "sign_chars": sign_chars,                                      # inside a class: "[\d{sign_chars}]"
+        "signs": f"[{sign_chars}]" if sign_chars else "(?!)",
+        "currency_words": alternation(currency_words),
+        "scale_words": alternation(scale_words, [r"\.", r"\b"]),       # the dot or the end of a word
+        "amount_scales": alternation([*scale_words, *(f"{word}." for word in shortcut_words)], [r"\.", ""]),
+        "suffixes": alternation(words_of(scales, "suffixes")),
+        "shortcuts": alternation(shortcut_words),
+        "island_words": alternation(island_words),
+        "island_initials": char_class(word[0] for word in island_words),
+        "spaced_currencies": alternation(spaced.get("currencies", [])),
+        "units": alternation(spaced.get("units", [])),
+        "tlds": alternation(word.lower() for word in pack.get("tlds", [])),
+    }
+    return CompiledPack(pack_digest(pack), fragments, signs, codes, values, expansions)
+
+class RulePattern(LazyPattern):
+    """
+    `LazyPattern` from a template with `{fragment}` placeholders, rendered again (and compiled
+    on next use) whenever another pack is installed
+    """
+    __slots__ = ("template",)
+
+    def __init__(self, template: str, flags: int = 0):
+        super().__init__(template, flags)
+        self.template = template
+
+    def render(self, fragments: dict[str, str]) -> None:
+        self.pattern = PLACEHOLDER.sub(lambda m: fragments[m[1]], self.template)
+        self.compiled = None
+
+@dataclass(eq=False)
+class Rules:
+    """
+    The installed pack: `fold`, `mask`, `pipeline` and `cache` build their patterns with `RULES.pattern`
+    and read the tables of `RULES`, both are updated in place by `install`
+    """
+    compiled: CompiledPack | None = None
+    signs: dict[str, str] = field(default_factory=dict)
+    codes: dict[str, str] = field(default_factory=dict)
+    scales: dict[str, int | float] = field(default_factory=dict)
+    shortcuts: dict[str, tuple[str, str]] = field(default_factory=dict)
+    patterns: list[RulePattern] = field(default_factory=list)
+    cache: dict[str, CompiledPack] = field(default_factory=dict) # digest -> compiled, in this process
+
+    @property
+    def digest(self) -> str:
+        return self.compiled.digest if self.compiled else ""
+
+    def pattern(self, template: str, flags: int = 0) -> RulePattern:
+        pattern = RulePattern(template, flags)
+        if self.compiled is not None:
+            pattern.render(self.compiled.fragments)
+        self.patterns.append(pattern)
+        return pattern
+
+    def install(self, pack: dict[str, Any] | CompiledPack) -> None:
+        """
+        Install a pack, or one compiled in another process: `CompiledPack` is plain strings and dicts,
+        it pickles as is and isn't compiled again
+        """
+        if isinstance(pack, CompiledPack):
+            compiled = self.cache.setdefault(pack.digest, pack)
+        else:
+            digest = pack_digest(pack)
+            if digest not in self.cache:
+                self.cache[digest] = compile_pack(pack)
+            compiled = self.cache[digest]
+        if compiled.digest == self.digest:
+            return # the patterns compiled so far stay valid, e.g. in forked workers
+        self.compiled = compiled
+        for table, values in [
+            (self.signs, compiled.signs), (self.codes, compiled.codes),
+            (self.scales, compiled.scales), (self.shortcuts, compiled.shortcuts),
+        ]:
+            table.clear()
+            table.update(values)
+        for pattern in self.patterns:
+            pattern.render(compiled.fragments)
+
+    @staticmethod
+    def lookup(table: dict[str, Any], word: str) -> Any:
+        """
+        Entry of a matched word, matched case-insensitively and maybe with an abbreviation's dot
+        """
+        key = word.lower()
+        for candidate in (key, key.removesuffix(".")):
+            if candidate in table:
+                return table[candidate]
+        # `re.IGNORECASE` equivalences `str.lower` doesn't know
+        return next(value for entry, value in table.items() if re.fullmatch(rf"{re.escape(entry)}\.?", word, re.IGNORECASE))
+
+RULES = Rules()
+
+def install(compiled: CompiledPack) -> None:
+    """
+    Process pool initializer, `initializer=install, initargs=(RULES.compiled,)`: the workers get the pack
+    of the parent whatever their start method ("spawn" and "forkserver" don't inherit it), already compiled
+    """
+    RULES.install(compiled)
+
+def use_packs(*packs: dict[str, Any] | str | os.PathLike) -> None:
+    """
+    Install DEFAULT_PACK extended by `packs` (dicts or `.toml`/`.json` paths) in this process.
+    The pools of `preprocess_many`, `preprocess_stream` and `run_corpus` started afterwards pass it to their workers.
+    """
+    RULES.install(merge_packs(DEFAULT_PACK, *(pack if isinstance(pack, dict) else load_pack(pack) for pack in packs)))
+
+def env_packs() -> list[str]:
+    return [path for path in os.environ.get(ENV, "").split(os.pathsep) if path]
+
+def export_packs(*paths: str | os.PathLike) -> None:
+    """
+    `use_packs` of the `TEXTUTILS_RULES` packs and `paths`, in this process and the ones it starts later,
+    whatever their start method
+    """
+    packs = [*env_packs(), *(os.path.abspath(path) for path in paths)]
+    os.environ[ENV] = os.pathsep.join(packs)
+    use_packs(*packs)
+
+use_packs(*env_packs())
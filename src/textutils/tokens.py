@@ -0,0 +1,126 @@
+import re
+from functools import partial
+from typing import Callable, Sequence
+from .pipeline import Stage
+
+LATIN_WORD = re.compile(r"[A-Za-z]+")
+CYRILLIC_WORD = re.compile(r"[А-Яа-яЁё]+")
+OTHER_WORD = re.compile(r"[^\W\dA-Za-zА-Яа-яЁё_]+")
+DIGITS = re.compile(r"\d{1,3}")
+SYMBOL = re.compile(r"[^\w\s]|_")
+LINE_BREAKS = re.compile(r"\n+")
+
+# Rough BPE costs (cl100k-style vocabularies): every word is a token plus one per this many letters,
+# Cyrillic words are split about 3x as often as Latin ones, other scripts more
+LATIN_LETTERS_PER_TOKEN = 15
+CYRILLIC_LETTERS_PER_TOKEN = 5
+OTHER_LETTERS_PER_TOKEN = 2
+
+# Cut points, coarsest first: paragraphs and lines as `normalize_whitespace` leaves them
+# (bullets are lines starting with "- " after `denoise`), then sentences, then words
+BOUNDARIES = [
+    re.compile(r"\n{2,}"),
+    re.compile(r"\n"),
+    re.compile(r"(?<=[.!?…;])\s+"),
+    re.compile(r"\s+"),
+]
+
+def estimate_tokens(text: str) -> int:
+    """
+    Tokenizer-free token count estimate for mixed Cyrillic/Latin text, a few C-speed scans.
+    Numbers cost a token per 3 digits, symbols and emoji a token per code point.
+    """
+    tokens = 0.0
+    for pattern, letters_per_token in [
+        (LATIN_WORD, LATIN_LETTERS_PER_TOKEN),
+        (CYRILLIC_WORD, CYRILLIC_LETTERS_PER_TOKEN),
+        (OTHER_WORD, OTHER_LETTERS_PER_TOKEN),
+    ]:
+        words = pattern.findall(text)
+        tokens += len(words) + sum(map(len, words)) / letters_per_token
+    tokens += len(DIGITS.findall(text)) + len(SYMBOL.findall(text)) + len(LINE_BREAKS.findall(text))
+    return round(tokens)
+
+def cut(text: str, max_tokens: int, estimator: Callable[[str], int], min_fill: float, level: int) -> str:
+    boundary = BOUNDARIES[level]
+    kept, used, end = 0, 0, 0 # `text[:kept]` costs `used`
+    for match in [*boundary.finditer(text), None]:
+        end = len(text) if match is None else match.start()
+        cost = estimator(text[kept:end])
+        if used + cost > max_tokens:
+            break
+        used += cost
+        kept = end if match is None else match.end()
+    else:
+        return text
+    head = text[:kept].rstrip()
+    if level + 1 == len(BOUNDARIES) or (used and used >= min_fill * max_tokens):
+        return head
+    # Too little kept at this level: fill the rest of the budget from the piece that didn't fit
+    tail = cut(text[kept:end], max_tokens - used, estimator, min_fill, level + 1)
+    return f"{text[:kept]}{tail}".rstrip() if tail else head
+
+def truncate_to_budget(
+    text: str, max_tokens: int, estimator: Callable[[str], int] = estimate_tokens, *, min_fill: float = 0.5,
+) -> str:
+    """
+    Longest prefix of `text` within `max_tokens` by `estimator` (`estimate_tokens`, or an exact tokenizer's
+    `lambda s: len(enc.encode(s))`) that ends at a paragraph or line boundary. A sentence or word boundary
+    is used only when whole lines would keep less than `min_fill` of the budget.
+    """
+    if estimator(text) <= max_tokens:
+        return text
+    budget = max_tokens
+    while budget > 0:
+        truncated = cut(text, budget, estimator, min_fill, 0)
+        # Pieces were costed one by one, an exact tokenizer may count their concatenation differently
+        excess = estimator(truncated) - max_tokens
+        if excess <= 0:
+            return truncated
+        budget -= excess
+    return ""
+
+def truncation_stage(
+    max_tokens: int, estimator: Callable[[str], int] = estimate_tokens, *, min_fill: float = 0.5,
+) -> Stage:
+    """
+    `truncate_to_budget` as the last stage of a chain, e.g. `Pipeline([*PREPROCESS.stages, truncation_stage(1000)])`
+    """
+    return Stage("truncate_to_budget", partial(truncate_to_budget, max_tokens=max_tokens, estimator=estimator, min_fill=min_fill))
+
+def allocate(costs: Sequence[int], total_tokens: int) -> int:
+    """
+    Largest per-text cap with `sum(min(cost, cap)) <= total_tokens`: short texts stay whole,
+    the long ones share what is left equally
+    """
+    remaining, left = total_tokens, len(costs)
+    for cost in sorted(costs):
+        if cost * left > remaining:
+            return remaining // left
+        remaining -= cost
+        left -= 1
+    return max(costs, default=0)
+
+def truncate_many(
+    texts: Sequence[str],
+    max_tokens: int | None = None,
+    *,
+    total_tokens: int | None = None,
+    estimator: Callable[[str], int] = estimate_tokens,
+    min_fill: float = 0.5,
+) -> list[str]:
+    """
+    `truncate_to_budget` for the texts of one LLM request: each text within `max_tokens`
+    and all of them within `total_tokens`. Each text is estimated once, only texts over their cap
+    are estimated piece by piece.
+    """
+    costs = [estimator(text) for text in texts]
+    cap = max(costs, default=0)
+    if max_tokens is not None:
+        cap = min(cap, max_tokens)
+    if total_tokens is not None:
+        cap = min(cap, allocate([min(cost, cap) for cost in costs], total_tokens))
+    return [
+        text if cost <= cap else truncate_to_budget(text, cap, estimator, min_fill=min_fill)
+        for text, cost in zip(texts, costs)
+    ]
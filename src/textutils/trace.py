@@ -0,0 +1,95 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    skipped: int = 0 # calls where the stage trigger was absent
+    seconds: float = 0.0
+    chars_in: int = 0
+    chars_out: int = 0
+
+class Trace:
+    """
+    Opt-in instrumentation of pipelines, aggregated across calls while active:
+    - wall time, calls/skips and input/output length per stage
+    - number of substitutions per rule (e.g. `mask.PHONE`, `fold.CURRENCY`)
+
+    with Trace() as trace:
+        preprocess(text)
+    trace.snapshot()
+    """
+    def __init__(self):
+        self.stages: dict[str, StageStats] = {}
+        self.rules: Counter[str] = Counter()
+        self._token: Token | None = None
+
+    def __enter__(self) -> "Trace":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._token = TRACE.set(self)
+
+    def stop(self) -> None:
+        if self._token is not None:
+            TRACE.reset(self._token)
+            self._token = None
+
+    def stage(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    def run(self, name: str, func: Callable[[str], str], text: str) -> str:
+        stats = self.stage(name)
+        started = time.perf_counter()
+        out = func(text)
+        stats.seconds += time.perf_counter() - started
+        stats.calls += 1
+        stats.chars_in += len(text)
+        stats.chars_out += len(out)
+        return out
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        JSON-serializable copy of the counters
+        """
+        return {
+            "stages": {name: asdict(stats) for name, stats in self.stages.items()},
+            "rules": dict(self.rules),
+        }
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.rules.clear()
+
+TRACE: ContextVar[Trace | None] = ContextVar("textutils_trace", default=None)
+
+def sub(rule: str, pattern: re.Pattern, repl: str | Callable[[re.Match], str], text: str) -> str:
+    """
+    `pattern.sub(repl, text)` that counts substitutions of `rule` when a trace is active
+    """
+    trace = TRACE.get()
+    if trace is None:
+        return pattern.sub(repl, text)
+    text, n = pattern.subn(repl, text)
+    if n:
+        trace.rules[rule] += n
+    return text
+
+def count(rule: str, n: int) -> None:
+    """
+    Count `n` substitutions of `rule` when a trace is active
+    """
+    trace = TRACE.get()
+    if trace is not None and n:
+        trace.rules[rule] += n
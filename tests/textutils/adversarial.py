@@ -0,0 +1,45 @@
+# Informal tests: runtime of the contact and number matchers must grow linearly with input length
+import statistics
+import time
+from textutils import BudgetExceeded, mask_contacts, preprocess
+from textutils.fold import fold_amounts, fold_currencies, fold_scale_units, fold_shortcuts
+
+cases = {
+    "phone: '+' and a digit run": lambda n: "+1" + "1" * n + "a",
+    "phone: spreadsheet row": lambda n: "+7 " + "12 - " * (n // 5) + "x",
+    "url: long word": lambda n: "a" * n + ".",
+    "url: dotted chain": lambda n: "a." * (n // 2) + "!",
+    "email: long local part": lambda n: "a" * n + " @",
+    "numbers: long digit run": lambda n: "1" * n + " ",
+    "numbers: spaced digits": lambda n: "1 " * (n // 2) + "тыс",
+}
+
+def elapsed(text: str, repeat: int = 3) -> float:
+    # Best of `repeat`: the first run also compiles the patterns, noise only ever adds time
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        mask_contacts(text)
+        fold_scale_units(text)
+        fold_shortcuts(text)
+        fold_currencies(text)
+        fold_amounts(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+# Linear is x8, 12 leaves room for timer noise while a quadratic matcher (x64) or even x8^1.2 fails
+print("Running adversarial tests (8x input -> at most ~8x time, fails above x12):")
+print("-" * 40)
+for name, make in cases.items():
+    # Median of interleaved rounds: a round slowed down by the machine being busy elsewhere can't decide alone
+    rounds = [(elapsed(make(2_000)), elapsed(make(16_000))) for _ in range(5)]
+    small, large = statistics.median(s for s, _ in rounds), statistics.median(l for _, l in rounds)
+    ratio = statistics.median(l / max(s, 1e-6) for s, l in rounds)
+    print(f"{name}: {small * 1000:.1f}ms -> {large * 1000:.1f}ms (x{ratio:.1f}) | {'✅' if ratio < 12 else '❌'}")
+
+try:
+    preprocess("Зарплата 100 тыс руб\n" * 10_000, budget=0.001)
+    print("budget | ❌")
+except BudgetExceeded as e:
+    print(f"budget: {e} | ✅")
+print("-" * 40)
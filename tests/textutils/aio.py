@@ -0,0 +1,82 @@
+# Informal tests: streamed results must match sequential ones, with bounded work in flight
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+from textutils import bucket_numbers, mask_contacts, preprocess, use_packs
+from textutils.aio import preprocess_stream
+
+texts: list[str] = [
+    f"Вакансия #{i}: зарплата {i * 1000} руб, звоните 8 999 123 45 {i % 100:02d}"
+    for i in range(500)
+]
+
+async def source(items: list[str], delay: float = 0.0, log: list[str] | None = None):
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        if log is not None:
+            log.append(item)
+        yield item
+
+def explode(text: str) -> str:
+    if text.endswith("7"):
+        raise ValueError(text)
+    return text
+
+def slow_upper(text: str) -> str:
+    time.sleep(0.001 * (int(text) % 5))
+    return text.upper()
+
+async def main() -> None:
+    for func in [preprocess, mask_contacts, bucket_numbers]:
+        out = [x async for x in preprocess_stream(source(texts), func, max_in_flight=16)]
+        print(f"{func.__name__} | {'✅' if out == [func(text) for text in texts] else '❌'}")
+
+    with ThreadPoolExecutor(4) as pool:
+        numbers = [str(i) for i in range(100)]
+        out = [x async for x in preprocess_stream(source(numbers), slow_upper, executor=pool, ordered=False)]
+        print(f"ordered=False | {'✅' if sorted(out, key=int) == numbers else '❌'}")
+
+        out = [x async for x in preprocess_stream(source(texts), explode, executor=pool, return_exceptions=True)]
+        errors = sum(isinstance(x, ValueError) for x in out)
+        print(f"return_exceptions | {'✅' if errors == 50 and len(out) == len(texts) else '❌'}")
+
+        # Backpressure: the input isn't pulled more than `max_in_flight` ahead of the consumer
+        pulled: list[str] = []
+        ahead = 0
+        consumed = 0
+        async for _ in preprocess_stream(source(texts, log=pulled), str.upper, executor=pool, max_in_flight=8):
+            consumed += 1
+            ahead = max(ahead, len(pulled) - consumed)
+            await asyncio.sleep(0)
+        print(f"backpressure: at most {ahead} ahead | {'✅' if ahead <= 8 else '❌'}")
+
+        # A slow source doesn't hold back results of texts already read
+        started = time.perf_counter()
+        stream = preprocess_stream(source(["a", "b"], delay=0.2), str.upper, executor=pool)
+        first = await anext(stream)
+        latency = time.perf_counter() - started
+        await stream.aclose()
+        print(f"latency: {latency:.2f}s | {'✅' if first == 'A' and latency < 0.35 else '❌'}")
+
+        # Leaving early cancels what's pending, the passed executor stays usable
+        async for _ in preprocess_stream(source(numbers), slow_upper, executor=pool, max_in_flight=4):
+            break
+        print(f"break | {'✅' if pool.submit(str.upper, 'ok').result() == 'OK' else '❌'}")
+
+if __name__ == "__main__":
+    print("Running tests for preprocess_stream:")
+    print("-" * 40)
+    asyncio.run(main())
+
+    async def spawned() -> list[str]:
+        return [out async for out in preprocess_stream(source(["Оклад 100 тенге"] * 4), max_in_flight=2)]
+
+    # The pool created by `preprocess_stream` hands the installed rule pack to spawned workers
+    multiprocessing.set_start_method("spawn", force=True)
+    use_packs({"currencies": {"KZT": {"sign": "₸", "words": ["тенге"]}}})
+    out = asyncio.run(spawned())
+    use_packs()
+    print(f"spawn workers use the rule pack | {'✅' if out == ['Оклад 100 ₸'] * 4 else f'❌ {out[0]}'}")
+    print("-" * 40)
@@ -0,0 +1,38 @@
+# Informal tests: parallel results must match sequential ones, in order
+import multiprocessing
+from textutils import bucket_numbers, clean_unicode, mask_contacts, preprocess, preprocess_many, preprocess_threaded, use_packs
+
+texts: list[str] = [
+    f"Вакансия #{i}: зарплата {i * 1000} руб, звоните 8 999 123 45 {i % 100:02d}"
+    for i in range(2000)
+]
+
+def explode(text: str) -> str:
+    if text.endswith("7"):
+        raise ValueError(text)
+    return text
+
+if __name__ == "__main__":
+    print("Running tests for preprocess_many:")
+    print("-" * 40)
+    for func in [preprocess, mask_contacts, bucket_numbers]:
+        out = list(preprocess_many(texts, func, workers=4, chunksize=64))
+        expected = [func(text) for text in texts]
+        print(f"{func.__name__} | {'✅' if out == expected else '❌'}")
+    out = list(preprocess_many(texts, explode, workers=2, return_exceptions=True))
+    errors = sum(isinstance(x, ValueError) for x in out)
+    print(f"return_exceptions | {'✅' if errors == 200 and len(out) == len(texts) else '❌'}")
+    for func in [preprocess, clean_unicode, lambda text: text.upper()]:
+        out = list(preprocess_threaded(texts, func, workers=4))
+        print(f"threaded {func.__name__} | {'✅' if out == [func(text) for text in texts] else '❌'}")
+    out = list(preprocess_threaded(texts[:100]))
+    print(f"threaded, default workers | {'✅' if out == [preprocess(text) for text in texts[:100]] else '❌'}")
+    out = list(preprocess_threaded(texts, explode, workers=3, return_exceptions=True))
+    print(f"threaded return_exceptions | {'✅' if sum(isinstance(x, ValueError) for x in out) == 200 else '❌'}")
+    # Workers started with "spawn" (the default on macOS) get the rule pack installed here
+    multiprocessing.set_start_method("spawn", force=True)
+    use_packs({"currencies": {"KZT": {"sign": "₸", "words": ["тенге"]}}})
+    out = list(preprocess_many(["Оклад 100 тенге"] * 8, workers=2, chunksize=2))
+    use_packs()
+    print(f"spawn workers use the rule pack | {'✅' if out == ['Оклад 100 ₸'] * 8 else f'❌ {out[0]}'}")
+    print("-" * 40)
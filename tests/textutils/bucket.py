@@ -0,0 +1,33 @@
+# Informal tests for number bucketing
+from textutils.bucket import BucketScheme, bucket_numbers, bucket_values, register_scheme
+
+tests: list[tuple[str, str]] = [
+    ("Зарплата 150 в час", "Зарплата 150 в час"),
+    ("Зарплата 200", "Зарплата 0.5k"),
+    ("Зарплата 500", "Зарплата 0.5k"),
+    ("Зарплата 501", "Зарплата 1k"),
+    ("Зарплата 85000, премия 20%", "Зарплата 120k, премия 20%"),
+    ("Заказ #12345", "Заказ #12345"),
+    ("Доход 440000", "Доход 440k"),
+    ("Доход 440001", "Доход >440 тыс"),
+]
+
+print("Running tests for bucket_numbers:")
+print("-" * 40)
+for inp, expected in tests:
+    out = bucket_numbers(inp)
+    print(f"'{inp}' → '{out}' | {'✅' if out == expected else '❌'}")
+
+register_scheme("usd_hourly", BucketScheme([(10, 20, "20$"), (20, 50, "50$")], overflow=">50$"))
+out = bucket_numbers("Rate 15-25, up to 100", "usd_hourly")
+print(f"custom scheme '{out}' | {'✅' if out == 'Rate 20$-50$, up to >50$' else '❌'}")
+
+try:
+    import numpy as np
+except ImportError:
+    print("bucket_values skipped: numpy is not installed")
+else:
+    out = bucket_values(np.array([150, 200, 501, 85_000.5, 1e6, np.nan]))
+    expected = ["", "0.5k", "1k", "120k", ">440 тыс", ""]
+    print(f"bucket_values {list(out)} | {'✅' if list(out) == expected else '❌'}")
+print("-" * 40)
@@ -0,0 +1,72 @@
+# Informal tests for the result cache
+import tempfile
+from pathlib import Path
+from textutils import Cache, LineCache, preprocess
+from textutils import bucket
+from functools import partial
+from textutils.cache import fingerprint
+from textutils.pipeline import STAGES, VIEWS
+from textutils.tokens import truncation_stage
+
+texts: list[str] = ["Зарплата 150.000 рублей", "Бюджет 5тр", "Зарплата 150.000 рублей", "hello"]
+
+print("Running tests for Cache:")
+print("-" * 40)
+cache = Cache(maxsize=2)
+out = [cache(text) for text in texts]
+print(f"same output | {'✅' if out == [preprocess(text) for text in texts] else '❌'}")
+print(f"counters {cache.stats} | {'✅' if (cache.stats.hits, cache.stats.misses, cache.stats.evictions) == (1, 3, 1) else '❌'}")
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = Path(tmp) / "cache.sqlite"
+    Cache(path=path)(texts[0])
+    cache = Cache(path=path)
+    cache(texts[0])
+    print(f"disk tier | {'✅' if cache.stats.disk_hits == 1 else '❌'}")
+    cache.close()
+
+before = fingerprint()
+bucket.register_scheme("default", bucket.BucketScheme([*bucket.BUCKETS, (440_000, 600_000, "600k")], overflow=">600 тыс"))
+changed = fingerprint()
+bucket.register_scheme("default", bucket.DEFAULT_SCHEME)
+print(f"fingerprint follows the bucket scheme | {'✅' if changed != before and fingerprint() == before else '❌'}")
+
+# Stages, views and partials are fingerprinted with their parameters
+cache = Cache(truncation_stage(5))
+out = [cache("один два три четыре пять шесть семь восемь девять десять"), Cache(STAGES["mask_contacts"])("hr@example.com")]
+ok = out[1] == "[EMAIL]" and Cache(VIEWS)("Оклад 100 руб")["llm"] == "Оклад 100 ₽"
+fingerprints = {
+    fingerprint(chain) for chain in [
+        truncation_stage(5), truncation_stage(10), VIEWS, STAGES["bucket_numbers"],
+        partial(bucket.bucket_numbers, scheme=bucket.BucketScheme([(100, 200, "0.2k")], overflow=">200")),
+        partial(bucket.bucket_numbers, scheme=bucket.BucketScheme([(100, 300, "0.3k")], overflow=">300")),
+    ]
+}
+print(f"stages, views and partials with their parameters | {'✅' if ok and len(fingerprints) == 6 else '❌'}")
+
+cache = Cache(STAGES["bucket_numbers"])
+before = cache.fingerprint
+cache("Зарплата 85000")
+bucket.register_scheme("default", bucket.BucketScheme([(100, 100_000, "100k")], overflow=">100k"))
+out = cache("Зарплата 85000")
+changed = cache.fingerprint
+bucket.register_scheme("default", bucket.DEFAULT_SCHEME)
+print(f"scheme registered after the cache | {'✅' if out == 'Зарплата 100k' and changed != before else f'❌ {out}'}")
+print("-" * 40)
+
+posts: list[str] = [
+    "Ищем разработчика\nЗП от 100\nдо 200 тыс руб\n\nПишите: +7 (999)\n123-45-67\n\n🔸 Удалёнка\n🔸 ДМС\n\n\n\nПодписывайтесь на канал!",
+    "Ищем дизайнера\nЗП 100 000\n-\n\n150 000 р\n\n🔸 Офис\nПодписывайтесь на канал!",
+    "\n•\nПодписывайтесь на канал!\n- - -\n",
+    "- * -\n==\n",
+]
+
+print("Running tests for LineCache:")
+print("-" * 40)
+line_cache = LineCache()
+for post in posts * 2:
+    out, expected = line_cache(post), preprocess(post)
+    print(f"{post[:20]!r} -> {out[:40]!r} | {'✅' if out == expected else f'❌ (Expected: {expected!r})'}")
+print(f"repeated lines hit {line_cache.stats} | {'✅' if line_cache.stats.hit_rate > 0.5 else '❌'}")
+print(f"lines spanning matches merged | {'✅' if line_cache.stats.merged > 0 else '❌'}")
+print("-" * 40)
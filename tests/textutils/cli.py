@@ -0,0 +1,72 @@
+# Informal tests for the command line: records out in input order, other fields and records kept as they are
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+from textutils import preprocess
+from textutils.cli import main
+
+records = [
+    {"id": 1, "text": "Оклад 100 тыс руб, пишите hr@example.com"},
+    {"id": 2, "text": 12345},
+    {"id": 3},
+    {"id": 4, "text": ["список"]},
+    {"id": 5, "text": None},
+    {"id": 6, "text": "Звоните 8 999 123 45 67"},
+    [7, "not an object"],
+]
+
+def run(argv: list[str]) -> str:
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        code = main([*argv, "-q"])
+    assert code == 0
+    return out.getvalue()
+
+if __name__ == "__main__":
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "posts.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+    print("Running tests for the command line:")
+    print("-" * 40)
+    for workers in ["1", "2"]:
+        out = [json.loads(line) for line in run([path, "-w", workers, "--output-field", "clean"]).splitlines()]
+        expected = [
+            {**record, "clean": preprocess(record["text"])} if isinstance(record, dict) and isinstance(record.get("text"), str) else record
+            for record in records
+        ]
+        print(f"jsonl, {workers} worker(s), missing and non-string fields passed through | {'✅' if out == expected else f'❌ {out}'}")
+
+    out = [json.loads(line) for line in run([path, "-w", "1", "-s", "mask_contacts"]).splitlines()]
+    print(f"stages, field overwritten | {'✅' if out[0]['text'] == 'Оклад 100 тыс руб, пишите [EMAIL]' and out[1] == records[1] else '❌'}")
+
+    path = os.path.join(tmp, "posts.csv")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("id,text\n1,Оклад 100 руб\n2,\n")
+    out = list(csv.DictReader(io.StringIO(run([path, "-w", "1", "--output-field", "clean"]))))
+    expected = [{"id": "1", "text": "Оклад 100 руб", "clean": "Оклад 100 ₽"}, {"id": "2", "text": "", "clean": ""}]
+    print(f"csv | {'✅' if out == expected else f'❌ {out}'}")
+
+    # A long run of records without the field streams through in constant memory
+    path = os.path.join(tmp, "sparse.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps({"id": i, "body": "x" * 50}) + "\n" for i in range(50_000))
+        f.write(json.dumps({"id": "last", "text": "Оклад 100 руб"}, ensure_ascii=False) + "\n")
+    lines = 0
+    class Sink(io.StringIO):
+        def write(self, s: str) -> int:
+            global lines
+            lines += s.count("\n")
+            return len(s)
+    tracemalloc.start()
+    with contextlib.redirect_stdout(Sink()):
+        main([path, "-w", "1", "-q"])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"50k records passed through, peak {peak / 1e6:.1f} MB | {'✅' if lines == 50_001 and peak < 2e6 else '❌'}")
+    print("-" * 40)
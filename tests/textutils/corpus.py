@@ -0,0 +1,99 @@
+# Informal tests: sharded runs must match `preprocess` record by record, interrupted runs must resume
+import json
+import multiprocessing
+import os
+import tempfile
+from textutils import mask_contacts, preprocess, use_packs
+from textutils.corpus import RecordIndex, plan_shards, run_corpus
+
+records = [{"id": i, "text": f"Вакансия #{i}: зарплата {i * 1000} руб, звоните 8 999 123 45 {i % 100:02d}"} for i in range(5000)]
+
+class Flaky:
+    # `preprocess` that fails on its `fail_at`-th call, like a worker killed mid-run
+    def __init__(self, fail_at: int):
+        self.calls, self.fail_at = 0, fail_at
+
+    def __call__(self, text: str) -> str:
+        self.calls += 1
+        if self.calls == self.fail_at:
+            raise KeyboardInterrupt
+        return preprocess(text)
+
+def outputs(out_dir: str) -> list[dict]:
+    names = sorted(name for name in os.listdir(out_dir) if name.endswith(".jsonl"))
+    return [json.loads(line) for name in names for line in open(os.path.join(out_dir, name), encoding="utf-8")]
+
+if __name__ == "__main__":
+    expected = [{**record, "text": preprocess(record["text"])} for record in records]
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "posts.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for i, record in enumerate(records):
+            f.write(json.dumps(record, ensure_ascii=False) + ("\n\n" if i == 10 else "\n"))
+
+    print("Running tests for run_corpus:")
+    print("-" * 40)
+    index = RecordIndex.open(path, stride=100)
+    cached = RecordIndex.open(path, stride=100)
+    print(f"index: {index.records} records, {len(index.offsets)} offsets | {'✅' if index.records == 5001 and cached.offsets == index.offsets else '❌'}")
+    shards = plan_shards(index, 4)
+    contiguous = all(a.end == b.start for a, b in zip(shards, shards[1:])) and shards[-1].end == index.size
+    print(f"plan: {[s.records for s in shards]} | {'✅' if len(shards) == 4 and contiguous and sum(s.records for s in shards) == 5001 else '❌'}")
+
+    out_dir = os.path.join(tmp, "parallel")
+    stats = run_corpus(path, out_dir, shards=4, workers=2, progress=None)
+    print(f"parallel | {'✅' if outputs(out_dir) == expected and all(s.done for s in stats) else '❌'}")
+
+    out_dir = os.path.join(tmp, "resumed")
+    flaky = Flaky(fail_at=2345)
+    try:
+        run_corpus(path, out_dir, flaky, shards=3, checkpoint_every=100, progress=None)
+    except KeyboardInterrupt:
+        pass
+    flaky.fail_at = 0
+    stats = run_corpus(path, out_dir, flaky, shards=3, checkpoint_every=100, progress=None)
+    resumed = sum(s.resumed for s in stats)
+    print(f"resumed after {resumed} records | {'✅' if outputs(out_dir) == expected and 0 < resumed < 5001 else '❌'}")
+    stats = run_corpus(path, out_dir, flaky, shards=3, progress=None)
+    print(f"finished run is skipped | {'✅' if sum(s.records for s in stats) == 0 and outputs(out_dir) == expected else '❌'}")
+    others = {
+        "shard count": dict(shards=5),
+        "chain": dict(func=mask_contacts),
+        "field": dict(field="body"),
+        "output field": dict(output_field="clean"),
+        "rule pack": dict(rules={"tlds": ["kz"]}),
+    }
+    for name, changed in others.items():
+        kwargs = {"func": flaky, "shards": 3, "progress": None, **changed}
+        if rules := kwargs.pop("rules", None):
+            use_packs(rules)
+        try:
+            run_corpus(path, out_dir, kwargs.pop("func"), **kwargs)
+            print(f"other {name} | ❌")
+        except ValueError as e:
+            print(f"other {name} | {'✅' if 'another' in str(e) else f'❌ {e}'}")
+        finally:
+            use_packs()
+
+    # Shards run by workers started with "spawn" use the rule pack installed here
+    multiprocessing.set_start_method("spawn", force=True)
+    use_packs({"currencies": {"KZT": {"sign": "₸", "words": ["тенге"]}}})
+    tenge = os.path.join(tmp, "tenge.jsonl")
+    with open(tenge, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps({"text": "Оклад 100 тенге"}, ensure_ascii=False) + "\n" for _ in range(8))
+    out_dir = os.path.join(tmp, "spawned")
+    run_corpus(tenge, out_dir, shards=2, workers=2, progress=None)
+    use_packs()
+    ok = [record["text"] for record in outputs(out_dir)] == ["Оклад 100 ₸"] * 8
+    print(f"spawn workers use the rule pack | {'✅' if ok else '❌'}")
+    # Records without a string field are written as they are, the shard doesn't fail
+    mixed = [{"id": 1, "text": "Оклад 100 руб"}, {"id": 2, "text": 42}, {"id": 3}, {"id": 4, "text": {"ru": "x"}}, [5]]
+    mixed_path = os.path.join(tmp, "mixed.jsonl")
+    with open(mixed_path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in mixed)
+    out_dir = os.path.join(tmp, "mixed")
+    stats = run_corpus(mixed_path, out_dir, shards=2, workers=2, output_field="clean", progress=None)
+    expected = [{"id": 1, "text": "Оклад 100 руб", "clean": "Оклад 100 ₽"}, *mixed[1:]]
+    ok = outputs(out_dir) == expected and sum(s.skipped for s in stats) == 4 and all(s.done for s in stats)
+    print(f"missing and non-string fields passed through | {'✅' if ok else f'❌ {outputs(out_dir)}'}")
+    print("-" * 40)
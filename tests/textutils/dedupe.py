@@ -0,0 +1,48 @@
+# Informal tests: reposts with another salary/contact are found, unrelated posts are not
+import os
+import tempfile
+from textutils.dedupe import DuplicateIndex
+
+posts = {
+    "sales": "Требуется менеджер по продажам в офис на Тверской. Зарплата 85 000 руб + бонусы. "
+             "График 5/2 с 9 до 18. Звоните +7 (920) 123-45-67 или пишите hr@shop.ru",
+    "python": "Ищем Python разработчика в команду платформы данных, удалёнка, "
+              "зарплата 250 тыс. Пишите @team_lead, подробности на jobs.example.io",
+    "courier": "Курьеры на велосипеде, оплата каждый день от 3000 р, свободный график",
+}
+reposts = {
+    "sales": "Требуется менеджер по продажам в офис на Тверской! Зарплата 90 000 руб + бонусы. "
+             "График 5/2 с 9 до 18. Звоните 8 999 111 22 33 или пишите @shop_hr",
+    "python": "Ищем Python разработчика в команду платформы данных, удалёнка, "
+              "зарплата 260 тыс. Пишите @hr_bot, подробности на jobs.example.io",
+}
+
+index = DuplicateIndex()
+for key, text in posts.items():
+    index.add(key, text)
+
+print("Running tests for DuplicateIndex:")
+print("-" * 40)
+for key, text in reposts.items():
+    found = [k for k, _ in index.query(text)]
+    print(f"repost of {key}: {found} | {'✅' if found == [key] else '❌'}")
+found = index.query("Продам гараж в Химках, 2 этажа, свет и вода")
+print(f"unrelated: {found} | {'✅' if found == [] else '❌'}")
+print(f"empty text: {index.query('')} | {'✅' if index.query('') == [] else '❌'}")
+
+# Past the buffer: rows are merged into the sorted band table
+for i in range(5000):
+    index.add(i, f"Объявление номер {i} {' '.join(str(i * j) for j in range(5))}")
+print(f"merged: {index.indexed}/{len(index)} | {'✅' if index.indexed > 0 else '❌'}")
+found = [k for k, _ in index.query(reposts["sales"])]
+print(f"repost after merge: {found} | {'✅' if found == ['sales'] else '❌'}")
+
+path = os.path.join(tempfile.mkdtemp(), "index.npz")
+index.save(path)
+loaded = DuplicateIndex.load(path)
+same = loaded.keys == index.keys and all(loaded.query(text) == index.query(text) for text in [*reposts.values(), posts["courier"]])
+print(f"save/load: {len(loaded)} posts | {'✅' if same and len(loaded) == len(index) else '❌'}")
+loaded.add("sales-2", reposts["sales"])
+found = [k for k, _ in loaded.query(reposts["sales"])]
+print(f"add after load: {found} | {'✅' if found == ['sales-2', 'sales'] else '❌'}")
+print("-" * 40)
@@ -1,4 +1,4 @@
-from textutils.fold import fold_currencies, fold_numbers, fold_scale_units
+from textutils.fold import Salary, extract_salaries, fold_amounts, fold_currencies, fold_numbers, fold_scale_units, fold_shortcuts
 
 tests: list[tuple[str, str]] = [
     ("Бюджет 5 тыс ₽.", ""),
@@ -44,3 +44,30 @@ for inp, expected in tests:
     out = fold_scale_units(out)
     out = fold_currencies(out)
     print(f"{inp} → {out} | {'✅' if out == expected else '❌'}")
+
+# fold_amounts must match the single-rule folds applied one after another
+amount_tests: list[str] = [
+    "Зарплата от 80 000 до 120.000 руб, бонусы 5тр.",
+    "10-20 тыс рублей, 1 – 2 тыс $, 6,5 тыс. р",
+    "Звонить после 18:00, 3-5 часа в день, 200 - 300",
+    "100 рубрика, 100 тысячами, 5тр2",
+    "а120.000 руб, 1'000р, 2`000 rub.",
+]
+print("Running tests for fold_amounts:")
+print("-" * 40)
+for inp in amount_tests:
+    out = fold_amounts(inp)
+    expected = fold_currencies(fold_scale_units(fold_numbers(fold_shortcuts(inp))))
+    print(f"{inp} → {out} | {'✅' if out == expected else '❌'}")
+
+salary_tests: list[tuple[str, list[Salary]]] = [
+    ("от 100 до 150 тыс руб", [Salary(100000, 150000, "RUB", 1000, "100 до 150 тыс руб")]),
+    ("Программист 1С 120-180к/мес.", [Salary(120000, 180000, None, 1000, "120-180к")]),
+    ("от 3.000₽ до 35.000₽ в день", [Salary(3000, 35000, "RUB", 1, "3.000₽ до 35.000₽")]),
+    ("бонус 5тр., до 2 тыс $", [Salary(5000, 5000, "RUB", 1000, "5тр."), Salary(None, 2000, "USD", 1000, "2 тыс $")]),
+    ("График 5/2 с 9 до 18", []),
+]
+for inp, expected in salary_tests:
+    out, salaries = extract_salaries(inp)
+    print(f"{inp} → {salaries} | {'✅' if salaries == expected and out == fold_amounts(inp) else '❌'}")
+print("-" * 40)
@@ -0,0 +1,32 @@
+# Informal tests for diacritics removal and letter folding
+import unicodedata
+from textutils import fold_letters, fold_letters_many, strip_diacritics, strip_diacritics_many
+from textutils.letters import fold_char
+
+tests: list[tuple[str, str, str]] = [
+    ("Café in Zürich, São Paulo, Łódź", "Cafe in Zurich, Sao Paulo, Łodz", "Cafe in Zurich, Sao Paulo, Łodz"),
+    ("Ёлка, ёжик и йогурт", "Елка, ежик и иогурт", "Елка, ежик и иогурт"),
+    ("Уда́рение", "Ударение", "Ударение"),
+    ("ﬁle № 5², Ｈｅｌｌｏ…", "ﬁle № 5², Ｈｅｌｌｏ…", "file No 52, Hello..."),
+    ("Зарплата 100\xa0000 ₽ 🔸", "Зарплата 100\xa0000 ₽ 🔸", "Зарплата 100 000 ₽ 🔸"),
+    ("Nguyễn, 한국어, 中文", "Nguyen, 한국어, 中文", "Nguyen, 한국어, 中文"),
+]
+
+print("Running tests for strip_diacritics and fold_letters:")
+print("-" * 40)
+for inp, stripped, folded in tests:
+    out = strip_diacritics(inp), fold_letters(inp)
+    print(f"'{inp}' → {out} | {'✅' if out == (stripped, folded) else f'❌ (Expected: {(stripped, folded)})'}")
+
+texts = [inp for inp, _, _ in tests]
+ok = strip_diacritics_many(texts) == [s for _, s, _ in tests] and fold_letters_many(texts) == [f for _, _, f in tests]
+print(f"batch forms | {'✅' if ok else '❌'}")
+
+# Every BMP code point, in and outside the precomputed blocks, as `unicodedata` folds it
+chars = [chr(code) for code in range(0x10000) if not 0xD800 <= code <= 0xDFFF]
+ok = all(strip_diacritics(c) == fold_char(c, "NFD") and fold_letters(c) == fold_char(c, "NFKD") for c in chars)
+print(f"same as unicodedata per character | {'✅' if ok else '❌'}")
+text = "Ёлка — café — Ｈｅｌｌｏ — ﬁ — 한국어 " * 10
+reference = "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+print(f"same as the NFD loop | {'✅' if strip_diacritics(text) == unicodedata.normalize('NFC', reference) else '❌'}")
+print("-" * 40)
@@ -1,5 +1,5 @@
 # Informal tests to check the function's behavior
-from textutils.mask import mask_contacts
+from textutils.mask import Contact, extract_contacts, mask_contacts, mask_passes
 
 tests = [
     # Positive tests for phone numbers
@@ -21,6 +21,15 @@ tests = [
     # Test with mixed content
     ("Email: user@example.com, URL: www.example.com", "Email: [EMAIL], URL: [URL]"),
     ("Набери меня на +7(920)123-45-67, или напиши @john_smith", "Набери меня на [PHONE], или напиши [MENTION]"),
+    ("Пишите hr@Company.io или в ЛС @hr_bot, ИНН: 7707083893", "Пишите [EMAIL] или в ЛС [MENTION], ИНН: [ID]"),
+    ("Сайт WWW.Example.COM/jobs (см. jobs.example.io)", "Сайт [URL] (см. [URL])"),
+
+    # Precedence of the passes: email, url, mention, phone, id, each on the output of the previous ones
+    ("Почта: name @gmail.com", "Почта: name @[URL]"),
+    ("Пишите @hr.company.com", "Пишите @[URL]"),
+    ("Канал @company.io", "Канал @[URL]"),
+    ("Резюме: http://x.io/cv@mail.ru", "Резюме: [URL]"),
+    ("@joe+1 123 456 7890", "[MENTION][PHONE]"),
 
 ]
 
@@ -30,3 +39,25 @@ for inp, expected in tests:
     out = mask_contacts(inp)
     print(f"'{inp}' → '{out}' | {'✅' if out == expected else '❌'}")
 print("-" * 40)
+
+text = "Резюме на hr@example.com или +7 (920) 123-45-67, ИНН: 123456"
+expected = [
+    Contact("email", 10, 24, "hr@example.com"),
+    Contact("phone", 29, 47, "+7 (920) 123-45-67"),
+    Contact("id", 54, 60, "123456"),
+]
+out = extract_contacts(text)
+print(f"extract_contacts: {out} | {'✅' if out == expected else '❌'}")
+print("-" * 40)
+
+# Regions: the passes run around the anchors only, same result as on the whole text
+texts = [
+    "x%ab.com@y.io", "ab-www.com", "a.b.c.io.com", "Https://x.ru и http://y", "Kelvin@ſite.ıo",
+    "тел 8 999 123 45 67, 7(812)555-12-34, (495)123-45-67, +7 920 1234567", "инн: 123, ИНН: 7707083893",
+    "слово.com, слово.Com, 1.2.3.co, ..ab.me, -x.dev/path)", " @a.io\n\n+7  (920)  123 45 67 ИНН:  12",
+    "8 (920) 123-45-67- 12 -34", "a@b.com8 999 123 45 67",
+]
+for inp in texts:
+    out, expected = mask_contacts(inp), mask_passes(inp)[0]
+    print(f"regions {inp!r} → {out!r} | {'✅' if out == expected else f'❌ (Expected: {expected!r})'}")
+print("-" * 40)
@@ -0,0 +1,46 @@
+# Informal tests: the compiled pipeline must match running every stage unconditionally
+from textutils import preprocess, preprocess_salaries
+from textutils.pipeline import PREPROCESS, STAGES, UNITS_AND_RANGES, VIEWS, Views, space_units_and_ranges
+
+tests: list[str] = [
+    "",
+    "Просто текст без цифр",
+    "Бюджет 5тр., 45м2, 150.000 рублей",
+    "Зарплата от 100 до 200 тыс руб, звоните +7-920-123-45-67",
+    "🔸 Программист 1С 120-180к/мес.\n🔸 Тестировщик\n\n\n\nпиши @john_smith",
+    "Email: user@example.com, URL: www.example.com, ИНН: 1234567890",
+]
+
+def run_unconditionally(text: str) -> str:
+    for stage in PREPROCESS.stages:
+        text = stage.func(text)
+    return text
+
+print("Running tests for preprocess pipeline:")
+print("-" * 40)
+for inp in tests:
+    out = preprocess(inp)
+    expected = run_unconditionally(inp)
+    print(f"{inp!r} → {out!r} | {'✅' if out == expected else '❌'}")
+print("-" * 40)
+
+# UNITS_AND_RANGES is only tried at the candidates of UNITS_ANCHOR, same result as a full scan
+for inp in ["от 100 до 200", "цена 5р, 7₽ и 3$", "от\n 12  до 3", "5м2р", "ОТ 100 ДО 5, от  1 до 2", "100 р от"]:
+    expected = UNITS_AND_RANGES.sub(lambda m: f"{m[5]}–{m[6]}" if m.lastgroup == "FROM_TO" else f" {m[0]}", inp)
+    out = space_units_and_ranges(inp)
+    print(f"{inp!r} → {out!r} | {'✅' if out == expected else '❌'}")
+
+text, salaries = preprocess_salaries(tests[3])
+print(f"salaries {salaries} | {'✅' if text == preprocess(tests[3]) and [(s.min, s.max) for s in salaries] == [(10000, 200000)] else '❌'}")
+
+views = Views({
+    "plain": [STAGES["denoise"]],
+    "masked": [STAGES["denoise"], STAGES["mask_contacts"]],
+    "bucketed": [STAGES["denoise"], STAGES["mask_contacts"], STAGES["bucket_numbers"]],
+})
+shared = len(views.root.children) == 1 and len(next(iter(views.root.children.values())).children) == 1
+print(f"views share their prefix | {'✅' if shared else '❌'}")
+for inp in tests:
+    out = VIEWS(inp)
+    expected = {name: chain(inp) for name, chain in VIEWS.views.items()}
+    print(f"{inp!r} → {out['search']!r} | {'✅' if out == expected and out['llm'] == preprocess(inp) else '❌'}")
@@ -0,0 +1,78 @@
+# Informal tests for rule packs
+import json
+import os
+import tempfile
+from textutils import Cache, LineCache, extract_salaries, mask_contacts, preprocess, use_packs
+from textutils.fold import SCALE_UNIT
+from textutils.rules import RULES, alternation
+
+alternations = [
+    (["рублей", "руб", "р", "rub"], ("",), "(?:rub|р(?:уб(?:лей)?)?)"),
+    (["тысячи", "тысяч", "тыс."], (r"\.", r"\b"), r"тыс(?:ячи?|\.|\b)"),
+    (["к", "k"], ("",), "[kк]"),
+    (["com", "co", "c.d"], ("",), r"c(?:\.d|om?)"),
+    (["млн.", "тыс."], (r"\.", r"\b"), r"(?:млн(?:\.|\b)|тыс(?:\.|\b))"),
+    ([], ("",), "(?!)"),
+]
+
+print("Running tests for rule packs:")
+print("-" * 40)
+for words, abbreviation, expected in alternations:
+    out = alternation(words, abbreviation)
+    print(f"{words} → {out} | {'✅' if out == expected else f'❌ (Expected: {expected})'}")
+
+default = RULES.digest
+cache, line_cache = Cache(), LineCache()
+before = preprocess("Оклад 100 тенге, 50тт, сайт shop.kz"), cache("Оклад 100 тенге"), line_cache("Оклад 100 тенге")
+use_packs({
+    "currencies": {"KZT": {"sign": "₸", "words": ["тенге", "тг"]}},
+    "shortcuts": {"тт": {"scale": "thousand", "currency": "KZT"}},
+    "tlds": ["kz"],
+})
+tests = [
+    ("Оклад 100 тенге, 5 тыс тг", "Оклад 100 ₸, 5000 ₸"),
+    ("Оклад 50тт.", "Оклад 50000 ₸"),
+    ("Оклад 100 руб, сайт shop.kz", "Оклад 100 ₽, сайт [URL]"),
+]
+for inp, expected in tests:
+    out = preprocess(inp)
+    print(f"{inp} → {out} | {'✅' if out == expected else f'❌ (Expected: {expected})'}")
+_, salaries = extract_salaries("от 100 до 150 тыс тенге, 50тт")
+ok = [(s.min, s.max, s.currency) for s in salaries] == [(100000, 150000, "KZT"), (50000, 50000, "KZT")]
+print(f"salaries in tenge | {'✅' if ok else f'❌ {salaries}'}")
+ok = cache("Оклад 100 тенге") == line_cache("Оклад 100 тенге") == "Оклад 100 ₸" and before[1] == before[2] == before[0][:15]
+print(f"caches follow the installed pack | {'✅' if ok else '❌'}")
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "pack.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"scales": {"million": {"value": 1000000, "words": ["млн."]}}}, f)
+    use_packs(path)
+    out = preprocess("Бюджет 2 млн руб, 100 тенге")
+print(f"pack file → {out} | {'✅' if out == 'Бюджет 2000000 ₽, 100 тенге' else '❌'}")
+
+use_packs()
+ok = RULES.digest == default and preprocess("Оклад 100 тенге, сайт shop.kz") == "Оклад 100 тенге, сайт shop.kz"
+print(f"defaults restored | {'✅' if ok and 'тенге' not in SCALE_UNIT.pattern else '❌'}")
+print(f"mask without the pack | {'✅' if mask_contacts('shop.kz, shop.io') == 'shop.kz, [URL]' else '❌'}")
+
+try:
+    use_packs({"currencies": {"KZT": {"sign": "KZT"}}})
+    print("multi-character sign | ❌ (no error)")
+except ValueError:
+    print("multi-character sign | ✅")
+invalid = {
+    "shortcut to a scale without words": {"scales": {"x": {"value": 5}}, "shortcuts": {"xx": {"scale": "x", "currency": "RUB"}}},
+    "scale without value": {"scales": {"y": {"words": ["y"]}}},
+}
+for name, pack in invalid.items():
+    try:
+        use_packs(pack)
+        print(f"{name} | ❌ (no error)")
+    except ValueError:
+        print(f"{name} | ✅")
+use_packs({"scales": {"m": {"value": 1000000, "suffixes": ["м"]}}, "shortcuts": {"мр": {"scale": "m", "currency": "RUB"}}})
+out = preprocess("Оклад 2мр")
+use_packs()
+print(f"shortcut to a scale with suffixes only → {out} | {'✅' if out == 'Оклад 2 м ₽' else '❌'}")
+print("-" * 40)
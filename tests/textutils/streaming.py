@@ -0,0 +1,45 @@
+# Informal tests: streaming cleanup must match the in-memory functions, in constant memory
+import tracemalloc
+from textutils.cleanup import (
+    clean_unicode, clean_unicode_lines, denoise, denoise_lines, normalize_whitespace, normalize_whitespace_lines,
+)
+
+texts: list[str] = [
+    "",
+    "\n\n\n",
+    "... --- !!!",
+    "🔸 Программист 1С\n🔸 Аналитик\n\n\n\n✦ один ✦\r\nТекст   с    пробелами   \n",
+    "Мои навыки:\n  ✨ Контент\n  ✨ Копирайтинг\n🌟Кейсы🌟",
+    "Список:\n\n  \n   • первый\n•\n— тире — строка два\r\nконец\v",
+    "**Жирный** ==текст== __подчёркнутый__\n\n\n\n   отступ\t\tтаб  \n---\n***",
+]
+
+def chunks(text: str, size: int) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def stream(lines_mb: float):
+    post = texts[3] + texts[5] + "\n"
+    for _ in range(int(lines_mb * 1e6 / len(post))):
+        yield from post.splitlines(keepends=True)
+
+def peak(lines_mb: float) -> int:
+    tracemalloc.start()
+    for _ in normalize_whitespace_lines(line + "\n" for line in denoise_lines(stream(lines_mb))):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+print("Running tests for streaming cleanup:")
+print("-" * 40)
+for func, lines in [
+    (clean_unicode, clean_unicode_lines), (denoise, denoise_lines), (normalize_whitespace, normalize_whitespace_lines),
+]:
+    ok = all(
+        "\n".join(lines(chunks(text, size))) == func(text)
+        for text in texts for size in [1, 3, 16, 1000]
+    )
+    print(f"{lines.__name__} | {'✅' if ok else '❌'}")
+small, large = peak(0.1), peak(0.4)
+print(f"peak memory: {small // 1024} KiB -> {large // 1024} KiB for 4x input | {'✅' if large < 2 * small else '❌'}")
+print("-" * 40)
@@ -0,0 +1,39 @@
+# Informal tests: truncation stays within the budget and cuts at the coarsest boundary it can
+from textutils import PREPROCESS, Pipeline, estimate_tokens, preprocess, truncate_many, truncate_to_budget, truncation_stage
+
+post = preprocess(
+    "🔸 Требуется менеджер по продажам в офис на Тверской. Зарплата 85 000 руб + бонусы.\n\n"
+    "🔸 Обязанности:\n- холодные звонки клиентам по базе\n- ведение CRM и отчётность\n"
+    "- встречи с клиентами. Переговоры. Заключение договоров\n\n"
+    "We offer flexible hours and a modern stack: Python, FastAPI, PostgreSQL. Звоните +7 (920) 123-45-67"
+)
+first_paragraph = post.split("\n\n")[0]
+
+tests: list[tuple[int, str]] = [
+    (1000, post),                                                # fits
+    (60, post[:post.index("\n- встречи")]),                      # whole bullets
+    (35, first_paragraph),                                       # a paragraph fills over half of the budget
+    (20, "Требуется менеджер по продажам в офис на Тверской."),  # a sentence
+    (3, "Требуется"),                                            # words as the last resort
+]
+
+print("Running tests for truncate_to_budget:")
+print("-" * 40)
+for max_tokens, expected in tests:
+    out = truncate_to_budget(post, max_tokens)
+    print(f"{max_tokens} tokens → {out[-40:]!r} | {'✅' if out == expected and estimate_tokens(out) <= max_tokens else '❌'}")
+
+words = lambda text: len(text.split()) # an "exact tokenizer"
+out = truncate_to_budget(post, 12, words)
+print(f"custom estimator → {out!r} | {'✅' if words(out) <= 12 and post.startswith(out) else '❌'}")
+
+chain = Pipeline([*PREPROCESS.stages, truncation_stage(20)])
+print(f"stage | {'✅' if chain(post) == truncate_to_budget(preprocess(post), 20) else '❌'}")
+
+texts = [post, first_paragraph, "короткий пост"]
+out = truncate_many(texts, total_tokens=80)
+costs = [estimate_tokens(text) for text in out]
+print(f"batch {costs} | {'✅' if sum(costs) <= 80 and out[1:] == texts[1:] else '❌'}")
+out = truncate_many(texts, 20)
+print(f"batch cap | {'✅' if out == [truncate_to_budget(text, 20) for text in texts] else '❌'}")
+print("-" * 40)
@@ -0,0 +1,18 @@
+# Informal tests for pipeline tracing
+from textutils import Trace, preprocess
+
+text = "Зарплата 150.000 рублей, пишите @john_smith или hr@example.com"
+
+print("Running tests for Trace:")
+print("-" * 40)
+with Trace() as trace:
+    out = preprocess(text)
+    preprocess("без цифр и контактов")
+snapshot = trace.snapshot()
+print(f"same output | {'✅' if out == preprocess(text) else '❌'}")
+print(f"rules {snapshot['rules']} | {'✅' if snapshot['rules'] == {'mask.EMAIL': 1, 'mask.MENTION': 1, 'fold.GROUPED_NUMBER': 1, 'fold.CURRENCY': 1} else '❌'}")
+stages = snapshot["stages"]
+print(f"stages | {'✅' if stages['denoise']['calls'] == 2 and stages['fold_amounts']['skipped'] == 1 else '❌'}")
+preprocess(text)
+print(f"inactive after exit | {'✅' if trace.snapshot() == snapshot else '❌'}")
+print("-" * 40)